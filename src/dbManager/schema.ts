@@ -57,7 +57,8 @@ export const CREATE_INDEXES = [
   'CREATE INDEX IF NOT EXISTS idx_message_history_ticket_no ON message_history(ticket_no)',
   'CREATE INDEX IF NOT EXISTS idx_message_history_side ON message_history(side)',
   'CREATE INDEX IF NOT EXISTS idx_managers_chat_id ON managers(chat_id)',
-  'CREATE INDEX IF NOT EXISTS idx_managers_is_active ON managers(is_active)'
+  'CREATE INDEX IF NOT EXISTS idx_managers_is_active ON managers(is_active)',
+  'CREATE INDEX IF NOT EXISTS idx_knowledge_base_category ON knowledge_base(category)'
 ];
 
 export const ALL_TABLES = [
@@ -3,6 +3,57 @@ import { KBManager as IKBManager, KnowledgeBase, AutoResponseResult } from './ty
 import { VectorIntegration, VectorIntegrationImpl } from './vectorIntegration';
 import { VectorServiceClient } from '../vectorService/vectorServiceClient';
 
+// Scratch views for reading a float32's bit pattern
+const FLOAT32_SCRATCH = new Float32Array(1);
+const UINT32_SCRATCH = new Uint32Array(FLOAT32_SCRATCH.buffer);
+
+/**
+ * Converts a number to IEEE 754 half-precision bits, rounding to nearest with ties to even
+ * (the same result as numpy's float32 -> float16 cast)
+ */
+function toFloat16Bits(value: number): number {
+  FLOAT32_SCRATCH[0] = value;
+  const bits = UINT32_SCRATCH[0];
+  const sign = (bits >>> 16) & 0x8000;
+  const exponent = ((bits >>> 23) & 0xff) - 127 + 15;
+  const mantissa = bits & 0x7fffff;
+
+  if (exponent >= 0x1f) {
+    // Overflow and infinity become infinity; NaN stays NaN
+    const isNaN = ((bits >>> 23) & 0xff) === 0xff && mantissa !== 0;
+    return sign | 0x7c00 | (isNaN ? 0x200 : 0);
+  }
+  if (exponent <= 0) {
+    // Subnormal half, or zero when too small
+    if (exponent < -10) {
+      return sign;
+    }
+    const full = mantissa | 0x800000;
+    const shift = 14 - exponent;
+    return sign | roundHalfToEven(full >>> shift, full & ((1 << shift) - 1), 1 << (shift - 1));
+  }
+  // A carry out of the mantissa correctly bumps the exponent (up to infinity)
+  return sign | roundHalfToEven((exponent << 10) | (mantissa >>> 13), mantissa & 0x1fff, 0x1000);
+}
+
+/**
+ * Rounds truncated bits up when the discarded remainder is above half, or exactly half and
+ * the kept value is odd
+ */
+function roundHalfToEven(kept: number, remainder: number, half: number): number {
+  return remainder > half || (remainder === half && (kept & 1) === 1) ? kept + 1 : kept;
+}
+
+/**
+ * Encodes an embedding for the context column: base64 of little-endian float16 values,
+ * the format the vector service reads back on startup
+ */
+function encodeEmbeddingContext(embedding: number[]): string {
+  const buffer = Buffer.alloc(embedding.length * 2);
+  embedding.forEach((value, i) => buffer.writeUInt16LE(toFloat16Bits(value), i * 2));
+  return buffer.toString('base64');
+}
+
 export class KBManager implements IKBManager {
   private db: Database.Database;
   private vectorIntegration: VectorIntegration | null = null;
@@ -224,7 +275,7 @@ export class KBManager implements IKBManager {
    * Generates embedding vector and stores it as context
    * @param question The question to generate embedding for
    * @param answer The answer to include in embedding generation
-   * @returns Embedding vector as JSON string
+   * @returns Embedding vector as base64-encoded float16 bytes
    */
   private async generateEmbeddingContext(question: string, answer: string): Promise<string> {
     if (!this.vectorIntegration) {
@@ -237,10 +288,10 @@ export class KBManager implements IKBManager {
       const embedding = await this.vectorIntegration.generateEmbedding(question, answer);
       
       if (embedding && embedding.length > 0) {
-        // Store embedding as JSON string in context field
-        const embeddingJson = JSON.stringify(Array.from(embedding));
+        // Store embedding as base64 float16 in context field (8x smaller than JSON)
+        const embeddingContext = encodeEmbeddingContext(Array.from(embedding));
         console.log(`✅ Generated embedding with ${embedding.length} dimensions`);
-        return embeddingJson;
+        return embeddingContext;
       }
 
       console.warn('⚠️ Failed to generate embedding, using empty context');
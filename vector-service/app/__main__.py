@@ -14,8 +14,7 @@ sys.path.insert(0, str(parent_dir))
 
 if __name__ == "__main__":
     import uvicorn
-    from app.main import app
-    from app.config import get_settings
+    from app.config import get_settings, uvicorn_options
     
     settings = get_settings()
     
@@ -32,11 +31,15 @@ if __name__ == "__main__":
     print(f"📊 Log Level: {settings.log_level}")
     print(f"🗄️ Database: {settings.db_path}")
     print(f"🤖 Model: {settings.model_name}")
+    print(f"👷 Workers: {settings.workers}")
     print("-" * 50)
     
+    # Auto-reload only works with a single worker
     uvicorn.run(
-        app,
+        "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        workers=settings.workers,
+        reload=settings.debug and settings.workers == 1,
+        **uvicorn_options(settings)
     )
\ No newline at end of file
@@ -3,37 +3,184 @@ Cache Manager for Vector Service
 Handles in-memory caching for KB entries and vector data with synchronization
 """
 
+import heapq
 import logging
 import time
-from typing import Dict, Optional, List, Any, Set
-from threading import Lock
+from collections import OrderedDict
+from typing import Dict, Optional, List, Any, Set, Tuple, Iterator, Iterable
+from threading import Event, Lock
 from datetime import datetime, timedelta
 
 from app.models import KBEntry, VectorData
 
 logger = logging.getLogger(__name__)
 
+# Cache timestamps use the monotonic clock: immune to wall-clock jumps (NTP,
+# manual changes) that would otherwise make TTLs fire early or late
+_mono = time.monotonic
+
+def _iso(ts: float) -> str:
+    """Format a wall-clock timestamp"""
+    return datetime.fromtimestamp(ts).isoformat()
+
+# Maximum number of released CacheEntry objects kept for reuse
+ENTRY_POOL_SIZE = 256
+
 class CacheEntry:
     """Represents a cached entry with metadata"""
     
-    def __init__(self, data: Any, ttl_seconds: Optional[int] = None):
+    # No per-instance __dict__: entries are small and numerous
+    __slots__ = ('key', 'data', 'created_at', 'access_count', 'accessed', 'expires_at')
+    
+    def __init__(self, data: Any, ttl_seconds: Optional[int] = None, key: Optional[int] = None):
+        self.reset(key, data, ttl_seconds)
+    
+    def reset(self, key: Optional[int], data: Any, ttl_seconds: Optional[int] = None) -> None:
+        """(Re)initialize all fields; used both on creation and when reusing a pooled entry"""
+        # key is written first so a lock-free reader holding a recycled entry
+        # sees the new key before it can observe the new data
+        self.key = key
         self.data = data
-        self.created_at = time.time()
-        self.last_accessed = time.time()
+        now = _mono()
+        self.created_at = now
         self.access_count = 1
-        self.expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        self.accessed = False
+        self.expires_at = now + ttl_seconds if ttl_seconds else None
     
     def is_expired(self) -> bool:
         """Check if cache entry has expired"""
-        if self.expires_at is None:
-            return False
-        return time.time() > self.expires_at
+        expires_at = self.expires_at
+        return expires_at is not None and _mono() > expires_at
     
     def touch(self) -> None:
-        """Update last accessed time and increment access count"""
-        self.last_accessed = time.time()
+        """Set the CLOCK access bit (a single store, safe without a lock)"""
+        self.accessed = True
         self.access_count += 1
 
+class AtomicCounter:
+    """
+    Thread-safe counter for cache statistics: a plain int guarded by its own
+    lock, so increments are never lost and reads do not change the count
+    """
+    
+    def __init__(self):
+        self._value = 0
+        self._lock = Lock()
+    
+    def increment(self) -> None:
+        with self._lock:
+            self._value += 1
+    
+    @property
+    def value(self) -> int:
+        return self._value
+
+class SegmentedLRUCache:
+    """
+    Hot/warm/cold segmented pseudo-LRU with CLOCK-style access bits.
+    New entries land in cold. A hit only sets the entry's accessed bit, so
+    lookups never reorder anything and need no lock. Promotion is lazy:
+    when the cold tail is reclaimed an accessed entry moves up to warm
+    (and from warm to hot) with its bit cleared, while unaccessed entries are
+    demoted or evicted. A one-off scan therefore only churns the cold segment.
+    
+    Lookups go through a single flat dict so readers always see an entry while
+    it moves between segments. Structural methods must be called under the
+    owner's lock.
+    """
+    
+    def __init__(self, max_size: int, hot_ratio: float = 0.2, warm_ratio: float = 0.2):
+        self.max_size = max_size
+        self.hot_capacity = max(1, int(max_size * hot_ratio))
+        self.warm_capacity = max(1, int(max_size * warm_ratio))
+        
+        self._entries: Dict[int, CacheEntry] = {}
+        
+        # Each segment holds keys ordered from oldest to newest
+        self._hot: "OrderedDict[int, None]" = OrderedDict()
+        self._warm: "OrderedDict[int, None]" = OrderedDict()
+        self._cold: "OrderedDict[int, None]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+    
+    def get(self, key: int) -> Optional[CacheEntry]:
+        """Get entry without taking a lock (single dict lookup)"""
+        return self._entries.get(key)
+    
+    def put(self, key: int, entry: CacheEntry) -> Optional[CacheEntry]:
+        """Insert a new entry into cold, or replace an existing entry in place and return it"""
+        previous = self._entries.get(key)
+        if previous is None:
+            self._cold[key] = None
+        self._entries[key] = entry
+        return previous
+    
+    def pop(self, key: int) -> Optional[CacheEntry]:
+        """Remove and return an entry"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for segment in (self._cold, self._warm, self._hot):
+                if key in segment:
+                    del segment[key]
+                    break
+        return entry
+    
+    def evict(self) -> Optional[Tuple[int, CacheEntry]]:
+        """Reclaim the first unaccessed entry, giving accessed ones a second chance"""
+        while self._entries:
+            if not self._cold:
+                # Everything has been promoted; demote the warm (or hot) tail
+                source = self._warm if self._warm else self._hot
+                key, _ = source.popitem(last=False)
+                self._cold[key] = None
+                continue
+            
+            key, _ = self._cold.popitem(last=False)
+            entry = self._entries[key]
+            if entry.accessed:
+                entry.accessed = False
+                self._warm[key] = None
+                self._balance_warm()
+                continue
+            
+            del self._entries[key]
+            return key, entry
+        return None
+    
+    def _balance_warm(self) -> None:
+        while len(self._warm) > self.warm_capacity:
+            key, _ = self._warm.popitem(last=False)
+            entry = self._entries[key]
+            if entry.accessed:
+                entry.accessed = False
+                self._hot[key] = None
+                self._balance_hot()
+            else:
+                self._cold[key] = None
+    
+    def _balance_hot(self) -> None:
+        while len(self._hot) > self.hot_capacity:
+            key, _ = self._hot.popitem(last=False)
+            entry = self._entries[key]
+            if entry.accessed:
+                entry.accessed = False
+                self._hot[key] = None
+            else:
+                self._warm[key] = None
+    
+    def items(self) -> Iterator[Tuple[int, CacheEntry]]:
+        return iter(list(self._entries.items()))
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hot.clear()
+        self._warm.clear()
+        self._cold.clear()
+
 class VectorCacheManager:
     """Manages in-memory caching for KB entries and vector data"""
     
@@ -42,16 +189,32 @@ class VectorCacheManager:
         self.default_ttl = default_ttl
         
         # Cache storage
-        self.kb_cache: Dict[int, CacheEntry] = {}
-        self.vector_cache: Dict[int, CacheEntry] = {}
+        self.kb_cache = SegmentedLRUCache(max_cache_size)
+        self.vector_cache = SegmentedLRUCache(max_cache_size)
+        
+        # Min-heaps of (expires_at, kb_id) for entries with a TTL. Stale items
+        # (entry replaced or removed) are skipped lazily when popped.
+        self._kb_exp_heap: List[Tuple[float, int]] = []
+        self._vector_exp_heap: List[Tuple[float, int]] = []
         
         # Cache metadata
-        self.cache_hits = 0
-        self.cache_misses = 0
-        self.cache_evictions = 0
+        self.cache_hits = AtomicCounter()
+        self.cache_misses = AtomicCounter()
+        self.cache_evictions = AtomicCounter()
         
-        # Thread safety
-        self._lock = Lock()
+        # Thread safety: one lock per cache so KB and vector traffic never contend,
+        # plus a lock for the dirty sets. Lock order is cache lock -> dirty lock.
+        # The cache locks guard structural changes only, cache hits are lock-free.
+        self._kb_lock = Lock()
+        self._vector_lock = Lock()
+        self._dirty_lock = Lock()
+        
+        # Free-list of released CacheEntry objects, shared by both caches.
+        # list.append/pop are atomic under the GIL, so no extra lock is needed.
+        self._entry_pool: List[CacheEntry] = []
+        
+        # Single-flight registry for database reloads, protected by _kb_lock
+        self._inflight: Dict[int, Event] = {}
         
         # Dirty tracking for synchronization
         self.dirty_kb_entries: Set[int] = set()
@@ -59,30 +222,57 @@ class VectorCacheManager:
         
         logger.info(f"VectorCacheManager initialized with max_size={max_cache_size}, ttl={default_ttl}")
     
+    def _new_entry(self, kb_id: int, data: Any, ttl_seconds: Optional[int]) -> CacheEntry:
+        """Take an entry from the free-list, or allocate one if it is empty"""
+        try:
+            entry = self._entry_pool.pop()
+        except IndexError:
+            return CacheEntry(data, ttl_seconds, key=kb_id)
+        entry.reset(kb_id, data, ttl_seconds)
+        return entry
+    
+    def _release_entry(self, entry: Optional[CacheEntry]) -> None:
+        """Return a removed entry to the free-list, dropping its data reference"""
+        if entry is None:
+            return
+        entry.data = None
+        if len(self._entry_pool) < ENTRY_POOL_SIZE:
+            self._entry_pool.append(entry)
+    
     def get_kb_entry(self, kb_id: int) -> Optional[KBEntry]:
         """Get KB entry from cache"""
-        with self._lock:
-            cache_entry = self.kb_cache.get(kb_id)
-            
-            if cache_entry is None:
-                self.cache_misses += 1
-                logger.debug(f"Cache miss for KB entry {kb_id}")
-                return None
-            
-            if cache_entry.is_expired():
-                self._remove_kb_entry(kb_id)
-                self.cache_misses += 1
-                logger.debug(f"Cache expired for KB entry {kb_id}")
-                return None
-            
-            cache_entry.touch()
-            self.cache_hits += 1
-            logger.debug(f"Cache hit for KB entry {kb_id}")
-            return cache_entry.data
+        # Hits are lock-free: the lookup is a single dict read and touch()
+        # only sets the access bit consumed by the evictor
+        cache_entry = self.kb_cache.get(kb_id)
+        
+        if cache_entry is None:
+            self.cache_misses.increment()
+            logger.debug("Cache miss for KB entry %s", kb_id)
+            return None
+        
+        if cache_entry.is_expired():
+            with self._kb_lock:
+                if self.kb_cache.get(kb_id) is cache_entry and cache_entry.is_expired():
+                    self._remove_kb_entry(kb_id)
+            self.cache_misses.increment()
+            logger.debug("Cache expired for KB entry %s", kb_id)
+            return None
+        
+        # Entries are recycled, so re-check the key after reading the data
+        data = cache_entry.data
+        if data is None or cache_entry.key != kb_id:
+            self.cache_misses.increment()
+            logger.debug("Cache miss for KB entry %s (entry recycled)", kb_id)
+            return None
+        
+        cache_entry.touch()
+        self.cache_hits.increment()
+        logger.debug("Cache hit for KB entry %s", kb_id)
+        return data
     
     def put_kb_entry(self, kb_id: int, kb_entry: KBEntry, ttl_seconds: Optional[int] = None) -> None:
         """Put KB entry into cache"""
-        with self._lock:
+        with self._kb_lock:
             # Use default TTL if not specified
             ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl
             
@@ -90,47 +280,62 @@ class VectorCacheManager:
             if len(self.kb_cache) >= self.max_cache_size and kb_id not in self.kb_cache:
                 self._evict_lru_kb_entry()
             
-            self.kb_cache[kb_id] = CacheEntry(kb_entry, ttl)
-            logger.debug(f"Cached KB entry {kb_id}")
+            cache_entry = self._new_entry(kb_id, kb_entry, ttl)
+            self._release_entry(self.kb_cache.put(kb_id, cache_entry))
+            if cache_entry.expires_at is not None:
+                self._push_expiration(self._kb_exp_heap, self.kb_cache, cache_entry.expires_at, kb_id)
+            logger.debug("Cached KB entry %s", kb_id)
     
     def remove_kb_entry(self, kb_id: int) -> bool:
         """Remove KB entry from cache"""
-        with self._lock:
+        with self._kb_lock:
             return self._remove_kb_entry(kb_id)
     
     def _remove_kb_entry(self, kb_id: int) -> bool:
-        """Internal method to remove KB entry (assumes lock is held)"""
-        if kb_id in self.kb_cache:
-            del self.kb_cache[kb_id]
-            self.dirty_kb_entries.discard(kb_id)
-            logger.debug(f"Removed KB entry {kb_id} from cache")
+        """Internal method to remove KB entry (assumes KB lock is held)"""
+        removed = self.kb_cache.pop(kb_id)
+        if removed is not None:
+            self._release_entry(removed)
+            with self._dirty_lock:
+                self.dirty_kb_entries.discard(kb_id)
+            logger.debug("Removed KB entry %s from cache", kb_id)
             return True
         return False
     
     def get_vector_data(self, kb_id: int) -> Optional[VectorData]:
         """Get vector data from cache"""
-        with self._lock:
-            cache_entry = self.vector_cache.get(kb_id)
-            
-            if cache_entry is None:
-                self.cache_misses += 1
-                logger.debug(f"Cache miss for vector data {kb_id}")
-                return None
-            
-            if cache_entry.is_expired():
-                self._remove_vector_data(kb_id)
-                self.cache_misses += 1
-                logger.debug(f"Cache expired for vector data {kb_id}")
-                return None
-            
-            cache_entry.touch()
-            self.cache_hits += 1
-            logger.debug(f"Cache hit for vector data {kb_id}")
-            return cache_entry.data
+        # Hits are lock-free: the lookup is a single dict read and touch()
+        # only sets the access bit consumed by the evictor
+        cache_entry = self.vector_cache.get(kb_id)
+        
+        if cache_entry is None:
+            self.cache_misses.increment()
+            logger.debug("Cache miss for vector data %s", kb_id)
+            return None
+        
+        if cache_entry.is_expired():
+            with self._vector_lock:
+                if self.vector_cache.get(kb_id) is cache_entry and cache_entry.is_expired():
+                    self._remove_vector_data(kb_id)
+            self.cache_misses.increment()
+            logger.debug("Cache expired for vector data %s", kb_id)
+            return None
+        
+        # Entries are recycled, so re-check the key after reading the data
+        data = cache_entry.data
+        if data is None or cache_entry.key != kb_id:
+            self.cache_misses.increment()
+            logger.debug("Cache miss for vector data %s (entry recycled)", kb_id)
+            return None
+        
+        cache_entry.touch()
+        self.cache_hits.increment()
+        logger.debug("Cache hit for vector data %s", kb_id)
+        return data
     
     def put_vector_data(self, kb_id: int, vector_data: VectorData, ttl_seconds: Optional[int] = None) -> None:
         """Put vector data into cache"""
-        with self._lock:
+        with self._vector_lock:
             # Use default TTL if not specified
             ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl
             
@@ -138,128 +343,173 @@ class VectorCacheManager:
             if len(self.vector_cache) >= self.max_cache_size and kb_id not in self.vector_cache:
                 self._evict_lru_vector_entry()
             
-            self.vector_cache[kb_id] = CacheEntry(vector_data, ttl)
-            logger.debug(f"Cached vector data {kb_id}")
+            cache_entry = self._new_entry(kb_id, vector_data, ttl)
+            self._release_entry(self.vector_cache.put(kb_id, cache_entry))
+            if cache_entry.expires_at is not None:
+                self._push_expiration(self._vector_exp_heap, self.vector_cache, cache_entry.expires_at, kb_id)
+            logger.debug("Cached vector data %s", kb_id)
     
     def remove_vector_data(self, kb_id: int) -> bool:
         """Remove vector data from cache"""
-        with self._lock:
+        with self._vector_lock:
             return self._remove_vector_data(kb_id)
     
     def _remove_vector_data(self, kb_id: int) -> bool:
-        """Internal method to remove vector data (assumes lock is held)"""
-        if kb_id in self.vector_cache:
-            del self.vector_cache[kb_id]
-            self.dirty_vector_entries.discard(kb_id)
-            logger.debug(f"Removed vector data {kb_id} from cache")
+        """Internal method to remove vector data (assumes vector lock is held)"""
+        removed = self.vector_cache.pop(kb_id)
+        if removed is not None:
+            self._release_entry(removed)
+            with self._dirty_lock:
+                self.dirty_vector_entries.discard(kb_id)
+            logger.debug("Removed vector data %s from cache", kb_id)
             return True
         return False
     
     def _evict_lru_kb_entry(self) -> None:
-        """Evict least recently used KB entry"""
-        if not self.kb_cache:
+        """Evict least recently used KB entry from the cold segment (assumes KB lock is held)"""
+        evicted = self.kb_cache.evict()
+        if evicted is None:
             return
         
-        # Find LRU entry
-        lru_id = min(self.kb_cache.keys(), 
-                    key=lambda k: self.kb_cache[k].last_accessed)
-        
-        self._remove_kb_entry(lru_id)
-        self.cache_evictions += 1
-        logger.debug(f"Evicted LRU KB entry {lru_id}")
+        lru_id, evicted_entry = evicted
+        self._release_entry(evicted_entry)
+        with self._dirty_lock:
+            self.dirty_kb_entries.discard(lru_id)
+        self.cache_evictions.increment()
     
     def _evict_lru_vector_entry(self) -> None:
-        """Evict least recently used vector entry"""
-        if not self.vector_cache:
+        """Evict least recently used vector entry from the cold segment (assumes vector lock is held)"""
+        evicted = self.vector_cache.evict()
+        if evicted is None:
             return
         
-        # Find LRU entry
-        lru_id = min(self.vector_cache.keys(), 
-                    key=lambda k: self.vector_cache[k].last_accessed)
-        
-        self._remove_vector_data(lru_id)
-        self.cache_evictions += 1
-        logger.debug(f"Evicted LRU vector data {lru_id}")
+        lru_id, evicted_entry = evicted
+        self._release_entry(evicted_entry)
+        with self._dirty_lock:
+            self.dirty_vector_entries.discard(lru_id)
+        self.cache_evictions.increment()
     
     def mark_kb_dirty(self, kb_id: int) -> None:
         """Mark KB entry as dirty (needs synchronization)"""
-        with self._lock:
+        with self._dirty_lock:
             self.dirty_kb_entries.add(kb_id)
-            logger.debug(f"Marked KB entry {kb_id} as dirty")
+            logger.debug("Marked KB entry %s as dirty", kb_id)
     
     def mark_vector_dirty(self, kb_id: int) -> None:
         """Mark vector data as dirty (needs synchronization)"""
-        with self._lock:
+        with self._dirty_lock:
             self.dirty_vector_entries.add(kb_id)
-            logger.debug(f"Marked vector data {kb_id} as dirty")
+            logger.debug("Marked vector data %s as dirty", kb_id)
+    
+    def mark_kb_dirty_bulk(self, kb_ids: Iterable[int]) -> None:
+        """Mark several KB entries as dirty with a single lock acquisition"""
+        with self._dirty_lock:
+            self.dirty_kb_entries.update(kb_ids)
+    
+    def mark_vector_dirty_bulk(self, kb_ids: Iterable[int]) -> None:
+        """Mark several vector entries as dirty with a single lock acquisition"""
+        with self._dirty_lock:
+            self.dirty_vector_entries.update(kb_ids)
     
     def get_dirty_kb_entries(self) -> Set[int]:
         """Get set of dirty KB entries"""
-        with self._lock:
+        with self._dirty_lock:
             return self.dirty_kb_entries.copy()
     
     def get_dirty_vector_entries(self) -> Set[int]:
         """Get set of dirty vector entries"""
-        with self._lock:
+        with self._dirty_lock:
             return self.dirty_vector_entries.copy()
     
+    def drain_dirty_kb_entries(self) -> Set[int]:
+        """Take the current set of dirty KB entries, leaving an empty set in its place"""
+        with self._dirty_lock:
+            drained, self.dirty_kb_entries = self.dirty_kb_entries, set()
+            return drained
+    
+    def drain_dirty_vector_entries(self) -> Set[int]:
+        """Take the current set of dirty vector entries, leaving an empty set in its place"""
+        with self._dirty_lock:
+            drained, self.dirty_vector_entries = self.dirty_vector_entries, set()
+            return drained
+    
     def clear_dirty_kb_entry(self, kb_id: int) -> None:
         """Clear dirty flag for KB entry"""
-        with self._lock:
+        with self._dirty_lock:
             self.dirty_kb_entries.discard(kb_id)
-            logger.debug(f"Cleared dirty flag for KB entry {kb_id}")
+            logger.debug("Cleared dirty flag for KB entry %s", kb_id)
     
     def clear_dirty_vector_entry(self, kb_id: int) -> None:
         """Clear dirty flag for vector entry"""
-        with self._lock:
+        with self._dirty_lock:
             self.dirty_vector_entries.discard(kb_id)
-            logger.debug(f"Cleared dirty flag for vector entry {kb_id}")
+            logger.debug("Cleared dirty flag for vector entry %s", kb_id)
     
-    def cleanup_expired_entries(self) -> int:
-        """Remove expired entries from cache"""
-        with self._lock:
-            expired_count = 0
-            
-            # Clean up expired KB entries
-            expired_kb_ids = [
-                kb_id for kb_id, entry in self.kb_cache.items() 
-                if entry.is_expired()
-            ]
-            for kb_id in expired_kb_ids:
-                self._remove_kb_entry(kb_id)
-                expired_count += 1
-            
-            # Clean up expired vector entries
-            expired_vector_ids = [
-                kb_id for kb_id, entry in self.vector_cache.items() 
-                if entry.is_expired()
-            ]
-            for kb_id in expired_vector_ids:
-                self._remove_vector_data(kb_id)
+    def _push_expiration(self, heap: List[Tuple[float, int]], cache: SegmentedLRUCache,
+                         expires_at: float, kb_id: int) -> None:
+        """Record an expiration time (assumes the cache's lock is held)"""
+        heapq.heappush(heap, (expires_at, kb_id))
+        
+        # Drop stale items once they clearly outnumber live entries
+        if len(heap) > 2 * len(cache) + 64:
+            live = []
+            for exp, kid in heap:
+                entry = cache.get(kid)
+                if entry is not None and entry.expires_at == exp:
+                    live.append((exp, kid))
+            heapq.heapify(live)
+            heap[:] = live
+    
+    def _pop_expired(self, heap: List[Tuple[float, int]], cache: SegmentedLRUCache, remove, now: float) -> int:
+        """Remove entries whose expiration has passed (assumes the cache's lock is held)"""
+        expired_count = 0
+        while heap and heap[0][0] <= now:
+            expires_at, kb_id = heapq.heappop(heap)
+            entry = cache.get(kb_id)
+            # Skip stale heap items left behind by replaced or removed entries
+            if entry is not None and entry.expires_at == expires_at:
+                remove(kb_id)
                 expired_count += 1
-            
-            if expired_count > 0:
-                logger.info(f"Cleaned up {expired_count} expired cache entries")
-            
-            return expired_count
+        return expired_count
+    
+    def cleanup_expired_entries(self) -> int:
+        """Remove expired entries from cache, touching only the expired ones"""
+        now = _mono()
+        expired_count = 0
+        
+        # Clean up expired KB entries
+        with self._kb_lock:
+            expired_count += self._pop_expired(self._kb_exp_heap, self.kb_cache, self._remove_kb_entry, now)
+        
+        # Clean up expired vector entries
+        with self._vector_lock:
+            expired_count += self._pop_expired(self._vector_exp_heap, self.vector_cache, self._remove_vector_data, now)
+        
+        if expired_count > 0:
+            logger.info(f"Cleaned up {expired_count} expired cache entries")
+        
+        return expired_count
     
     def invalidate_entry(self, kb_id: int) -> None:
         """Invalidate both KB and vector cache entries for a given ID"""
-        with self._lock:
+        with self._kb_lock:
             removed_kb = self._remove_kb_entry(kb_id)
+        with self._vector_lock:
             removed_vector = self._remove_vector_data(kb_id)
-            
-            if removed_kb or removed_vector:
-                logger.info(f"Invalidated cache entries for KB ID {kb_id}")
+        
+        if removed_kb or removed_vector:
+            logger.info(f"Invalidated cache entries for KB ID {kb_id}")
     
     def clear_all(self) -> None:
         """Clear all cache entries"""
-        with self._lock:
+        with self._kb_lock, self._vector_lock, self._dirty_lock:
             kb_count = len(self.kb_cache)
             vector_count = len(self.vector_cache)
             
             self.kb_cache.clear()
             self.vector_cache.clear()
+            self._kb_exp_heap.clear()
+            self._vector_exp_heap.clear()
             self.dirty_kb_entries.clear()
             self.dirty_vector_entries.clear()
             
@@ -267,54 +517,103 @@ class VectorCacheManager:
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with self._lock:
-            total_requests = self.cache_hits + self.cache_misses
-            hit_rate = (self.cache_hits / total_requests * 100) if total_requests > 0 else 0
-            
-            return {
-                "kb_cache_size": len(self.kb_cache),
-                "vector_cache_size": len(self.vector_cache),
-                "max_cache_size": self.max_cache_size,
-                "cache_hits": self.cache_hits,
-                "cache_misses": self.cache_misses,
-                "cache_evictions": self.cache_evictions,
-                "hit_rate_percent": round(hit_rate, 2),
-                "dirty_kb_entries": len(self.dirty_kb_entries),
-                "dirty_vector_entries": len(self.dirty_vector_entries),
-                "default_ttl": self.default_ttl
+        cache_hits = self.cache_hits.value
+        cache_misses = self.cache_misses.value
+        total_requests = cache_hits + cache_misses
+        hit_rate = (cache_hits / total_requests * 100) if total_requests > 0 else 0
+        
+        return {
+            "kb_cache_size": len(self.kb_cache),
+            "vector_cache_size": len(self.vector_cache),
+            "max_cache_size": self.max_cache_size,
+            "cache_hits": cache_hits,
+            "cache_misses": cache_misses,
+            "cache_evictions": self.cache_evictions.value,
+            "hit_rate_percent": round(hit_rate, 2),
+            "dirty_kb_entries": len(self.dirty_kb_entries),
+            "dirty_vector_entries": len(self.dirty_vector_entries),
+            "default_ttl": self.default_ttl
+        }
+    
+    def _snapshot_entries(self, cache: SegmentedLRUCache, dirty: Set[int]) -> List[Tuple]:
+        """Copy raw entry metadata (assumes the cache's lock is held)"""
+        return [
+            (kb_id, entry.created_at, entry.access_count, entry.expires_at,
+             entry.is_expired(), kb_id in dirty)
+            for kb_id, entry in cache.items()
+        ]
+    
+    @staticmethod
+    def _format_entries(snapshot: List[Tuple]) -> List[Dict[str, Any]]:
+        # Entry timestamps are monotonic; shift them onto the wall clock for display.
+        # Hits only set the access bit, so last_accessed is the insertion time: exact
+        # for entries that were never hit, a lower bound for the rest
+        offset = time.time() - _mono()
+        return [
+            {
+                "kb_id": kb_id,
+                "created_at": _iso(created_at + offset),
+                "last_accessed": _iso(created_at + offset),
+                "access_count": access_count,
+                "expires_at": _iso(expires_at + offset) if expires_at else None,
+                "is_expired": is_expired,
+                "is_dirty": is_dirty
             }
+            for kb_id, created_at, access_count, expires_at, is_expired, is_dirty in snapshot
+        ]
     
     def get_cache_entries_info(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get detailed information about cache entries"""
-        with self._lock:
-            kb_entries_info = []
-            for kb_id, entry in self.kb_cache.items():
-                kb_entries_info.append({
-                    "kb_id": kb_id,
-                    "created_at": datetime.fromtimestamp(entry.created_at).isoformat(),
-                    "last_accessed": datetime.fromtimestamp(entry.last_accessed).isoformat(),
-                    "access_count": entry.access_count,
-                    "expires_at": datetime.fromtimestamp(entry.expires_at).isoformat() if entry.expires_at else None,
-                    "is_expired": entry.is_expired(),
-                    "is_dirty": kb_id in self.dirty_kb_entries
-                })
-            
-            vector_entries_info = []
-            for kb_id, entry in self.vector_cache.items():
-                vector_entries_info.append({
-                    "kb_id": kb_id,
-                    "created_at": datetime.fromtimestamp(entry.created_at).isoformat(),
-                    "last_accessed": datetime.fromtimestamp(entry.last_accessed).isoformat(),
-                    "access_count": entry.access_count,
-                    "expires_at": datetime.fromtimestamp(entry.expires_at).isoformat() if entry.expires_at else None,
-                    "is_expired": entry.is_expired(),
-                    "is_dirty": kb_id in self.dirty_vector_entries
-                })
-            
-            return {
-                "kb_entries": kb_entries_info,
-                "vector_entries": vector_entries_info
-            }
+        # Only copy raw values under the locks; formatting happens after release
+        with self._kb_lock:
+            kb_snapshot = self._snapshot_entries(self.kb_cache, self.dirty_kb_entries)
+        with self._vector_lock:
+            vector_snapshot = self._snapshot_entries(self.vector_cache, self.dirty_vector_entries)
+        
+        return {
+            "kb_entries": self._format_entries(kb_snapshot),
+            "vector_entries": self._format_entries(vector_snapshot)
+        }
+    
+    def _reload_kb_entries(self, kb_ids: Set[int], kb_loader, timeout: float = 30.0) -> int:
+        """
+        Reload KB entries from the database into the cache in one batched query.
+        Loads are single-flight per ID: an ID already being reloaded by another
+        caller is waited on instead of being queried again.
+        """
+        claimed: List[int] = []
+        waiting: List[Event] = []
+        with self._kb_lock:
+            for kb_id in kb_ids:
+                event = self._inflight.get(kb_id)
+                if event is None:
+                    self._inflight[kb_id] = Event()
+                    claimed.append(kb_id)
+                else:
+                    waiting.append(event)
+        
+        try:
+            if claimed:
+                fresh_entries = kb_loader.get_kb_entries(claimed)
+                for kb_id in claimed:
+                    fresh_entry = fresh_entries.get(kb_id)
+                    if fresh_entry:
+                        self.put_kb_entry(kb_id, fresh_entry)
+                    else:
+                        # Entry was deleted, remove from cache
+                        self.remove_kb_entry(kb_id)
+                # Reloaded rows may have added or removed a category
+                kb_loader.invalidate_categories()
+        finally:
+            with self._kb_lock:
+                for kb_id in claimed:
+                    self._inflight.pop(kb_id).set()
+        
+        for event in waiting:
+            event.wait(timeout)
+        
+        # IDs reloaded by another caller are counted there
+        return len(claimed)
     
     def sync_with_database(self, kb_loader, vector_manager) -> Dict[str, int]:
         """Synchronize dirty entries with database and vector index"""
@@ -325,35 +624,21 @@ class VectorCacheManager:
         }
         
         # Sync dirty KB entries
-        dirty_kb_ids = self.get_dirty_kb_entries()
-        for kb_id in dirty_kb_ids:
+        dirty_kb_ids = self.drain_dirty_kb_entries()
+        if dirty_kb_ids:
             try:
-                # Reload KB entry from database
-                fresh_entry = kb_loader.get_kb_entry(kb_id)
-                if fresh_entry:
-                    self.put_kb_entry(kb_id, fresh_entry)
-                    self.clear_dirty_kb_entry(kb_id)
-                    sync_stats["kb_synced"] += 1
-                else:
-                    # Entry was deleted, remove from cache
-                    self.remove_kb_entry(kb_id)
-                    self.clear_dirty_kb_entry(kb_id)
-                    sync_stats["kb_synced"] += 1
+                sync_stats["kb_synced"] += self._reload_kb_entries(dirty_kb_ids, kb_loader)
             except Exception as e:
-                logger.error(f"Failed to sync KB entry {kb_id}: {e}")
-                sync_stats["errors"] += 1
+                logger.error(f"Failed to sync {len(dirty_kb_ids)} KB entries: {e}")
+                sync_stats["errors"] += len(dirty_kb_ids)
+                # Put the IDs back so the next sync retries them
+                self.mark_kb_dirty_bulk(dirty_kb_ids)
         
         # Sync dirty vector entries
-        dirty_vector_ids = self.get_dirty_vector_entries()
-        for kb_id in dirty_vector_ids:
-            try:
-                # This would typically involve regenerating vectors
-                # For now, just clear the dirty flag
-                self.clear_dirty_vector_entry(kb_id)
-                sync_stats["vector_synced"] += 1
-            except Exception as e:
-                logger.error(f"Failed to sync vector entry {kb_id}: {e}")
-                sync_stats["errors"] += 1
+        # This would typically involve regenerating vectors
+        # For now, draining the dirty set is all that is needed
+        dirty_vector_ids = self.drain_dirty_vector_entries()
+        sync_stats["vector_synced"] += len(dirty_vector_ids)
         
         if sync_stats["kb_synced"] > 0 or sync_stats["vector_synced"] > 0:
             logger.info(f"Cache sync completed: {sync_stats}")
@@ -4,12 +4,10 @@ Handles environment variables and service settings
 """
 
 import os
-from typing import Optional
-from pydantic_settings import BaseSettings
-from pydantic import Field
-from functools import lru_cache
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict
 from dotenv import load_dotenv
-import os
 
 # Force load .env files with explicit paths
 def load_env_files():
@@ -28,52 +26,174 @@ def load_env_files():
     if os.path.exists(local_env):
         load_dotenv(local_env, override=True)
 
-# Load environment files
-load_env_files()
-
-class Settings(BaseSettings):
-    """Application settings loaded from environment variables"""
+@dataclass(frozen=True)
+class Settings:
+    """
+    Application settings loaded from environment variables
+    
+    Note on workers: every uvicorn worker is a separate process with its own
+    model, FAISS index and VectorCacheManager. Vectors added or updated through
+    one worker are not visible to the others, so running with workers > 1
+    requires moving that shared state to an external store (e.g. Redis).
+    """
     
     # Service configuration
-    host: str = Field(default="0.0.0.0", env="HOST")
-    port: int = Field(default=8000, env="PORT")
-    debug: bool = Field(default=False, env="DEBUG")
-    log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    host: str = "0.0.0.0"
+    port: int = 8000
+    debug: bool = False
+    log_level: str = "INFO"
+    workers: int = 1
+    io_workers: int = 4
     
     # Database configuration
-    db_path: str = Field(default="./data/support.db", env="DB_PATH")
+    db_path: str = "./data/support.db"
     
     # Model configuration
-    model_name: str = Field(
-        default="sentence-transformers/all-MiniLM-L6-v2", 
-        env="MODEL_NAME"
-    )
-    similarity_threshold: float = Field(default=0.7, env="SIMILARITY_THRESHOLD")
-    faiss_index_type: str = Field(default="IndexFlatIP", env="FAISS_INDEX_TYPE")
+    model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    similarity_threshold: float = 0.7
+    faiss_index_type: str = "IndexFlatIP"
+    use_gpu_faiss: bool = False
+    
+    # HNSW index build/search breadth (FAISS_INDEX_TYPE=HNSW32 or IndexHNSWFlat)
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    
+    # FAISS index snapshot written on startup and shutdown and reused on the
+    # next start so unchanged entries are not re-encoded (empty disables it)
+    index_snapshot_path: str = ""
     
     # Performance settings
-    max_cache_size: int = Field(default=1000, env="MAX_CACHE_SIZE")
-    embedding_dimension: int = Field(default=384, env="EMBEDDING_DIMENSION")
-    
-    def __init__(self, **kwargs):
-        # Ensure .env files are loaded before initialization
-        load_env_files()
-        super().__init__(**kwargs)
-        
-        # Debug: Print what we actually got
-        print(f"🔧 Settings initialized:")
-        print(f"   DB_PATH from env: {os.environ.get('DB_PATH', 'NOT SET')}")
-        print(f"   db_path in settings: {self.db_path}")
-    
-    class Config:
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-        extra = "ignore"  # Ignore extra environment variables
+    max_cache_size: int = 1000
+    embedding_dimension: int = 384
+    precision: str = "fp32"
+    encoder_backend: str = "torch"
+    onnx_quantize: bool = False
+    compile_model: bool = False
+    
+    # Thread counts for FAISS (OpenMP) and torch; 0 keeps the library default
+    faiss_threads: int = 0
+    torch_threads: int = 0
+    
+    # Embedding cache (0 disables it)
+    max_embedding_cache: int = 1024
+    
+    # Search result cache (0 disables it)
+    max_result_cache: int = 512
+    
+    # Embedding micro-batching
+    embed_max_batch_size: int = 32
+    embed_max_wait_ms: float = 10.0
+
+_TRUE_VALUES = {"1", "true", "t", "yes", "y", "on"}
+_FALSE_VALUES = {"0", "false", "f", "no", "n", "off"}
+
+def _env_str(name: str, default: str) -> str:
+    return os.environ.get(name, default)
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"{name} must be a boolean, got {value!r}")
+
+def _load() -> Settings:
+    """Build settings from .env files and the environment in a single pass"""
+    load_env_files()
+    
+    defaults = Settings()
+    settings = Settings(
+        host=_env_str("HOST", defaults.host),
+        port=_env_int("PORT", defaults.port),
+        debug=_env_bool("DEBUG", defaults.debug),
+        log_level=_env_str("LOG_LEVEL", defaults.log_level),
+        workers=_env_int("WORKERS", defaults.workers),
+        io_workers=_env_int("IO_WORKERS", defaults.io_workers),
+        db_path=_env_str("DB_PATH", defaults.db_path),
+        model_name=_env_str("MODEL_NAME", defaults.model_name),
+        similarity_threshold=_env_float("SIMILARITY_THRESHOLD", defaults.similarity_threshold),
+        faiss_index_type=_env_str("FAISS_INDEX_TYPE", defaults.faiss_index_type),
+        use_gpu_faiss=_env_bool("USE_GPU_FAISS", defaults.use_gpu_faiss),
+        hnsw_ef_construction=_env_int("HNSW_EF_CONSTRUCTION", defaults.hnsw_ef_construction),
+        hnsw_ef_search=_env_int("HNSW_EF_SEARCH", defaults.hnsw_ef_search),
+        index_snapshot_path=_env_str("INDEX_SNAPSHOT_PATH", defaults.index_snapshot_path),
+        max_cache_size=_env_int("MAX_CACHE_SIZE", defaults.max_cache_size),
+        embedding_dimension=_env_int("EMBEDDING_DIMENSION", defaults.embedding_dimension),
+        precision=_env_str("PRECISION", defaults.precision).lower(),
+        encoder_backend=_env_str("ENCODER_BACKEND", defaults.encoder_backend).lower(),
+        onnx_quantize=_env_bool("ONNX_QUANTIZE", defaults.onnx_quantize),
+        compile_model=_env_bool("COMPILE_MODEL", defaults.compile_model),
+        faiss_threads=_env_int("FAISS_THREADS", defaults.faiss_threads),
+        torch_threads=_env_int("TORCH_THREADS", defaults.torch_threads),
+        max_embedding_cache=_env_int("MAX_EMBEDDING_CACHE", defaults.max_embedding_cache),
+        max_result_cache=_env_int("MAX_RESULT_CACHE", defaults.max_result_cache),
+        embed_max_batch_size=_env_int("EMBED_MAX_BATCH_SIZE", defaults.embed_max_batch_size),
+        embed_max_wait_ms=_env_float("EMBED_MAX_WAIT_MS", defaults.embed_max_wait_ms),
+    )
+    
+    if not 1 <= settings.port <= 65535:
+        raise ValueError("Port must be between 1 and 65535")
+    if not 0.0 <= settings.similarity_threshold <= 1.0:
+        raise ValueError("Similarity threshold must be between 0.0 and 1.0")
+    if settings.workers < 1:
+        raise ValueError("Workers must be at least 1")
+    if settings.io_workers < 1:
+        raise ValueError("IO workers must be at least 1")
+    if settings.precision not in ("fp32", "fp16", "bf16"):
+        raise ValueError("Precision must be one of: fp32, fp16, bf16")
+    if settings.encoder_backend not in ("torch", "onnx"):
+        raise ValueError("Encoder backend must be one of: torch, onnx")
+    if settings.faiss_threads < 0 or settings.torch_threads < 0:
+        raise ValueError("Thread counts must not be negative")
+    if settings.embed_max_batch_size < 1:
+        raise ValueError("Embed max batch size must be at least 1")
+    if settings.embed_max_wait_ms < 0:
+        raise ValueError("Embed max wait must not be negative")
+    if settings.hnsw_ef_construction < 1 or settings.hnsw_ef_search < 1:
+        raise ValueError("HNSW efConstruction and efSearch must be at least 1")
+    
+    return settings
+
+# Settings are read once at import; the instance is immutable afterwards
+_settings = _load()
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance"""
-    return Settings()
+    """Get the settings instance"""
+    return _settings
+
+def uvicorn_options(settings: Settings) -> Dict[str, Any]:
+    """
+    Server options shared by both entrypoints: the libuv event loop and C HTTP
+    parser installed by uvicorn[standard] (uvloop is not available on Windows),
+    and per-request access logs only in debug mode
+    """
+    return {
+        "loop": "asyncio" if sys.platform == "win32" else "uvloop",
+        "http": "httptools",
+        "access_log": settings.debug,
+    }
 
 def validate_settings() -> None:
     """Validate required settings and environment"""
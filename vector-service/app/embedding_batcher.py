@@ -0,0 +1,182 @@
+"""
+Micro-Batchers for the Vector Service
+Coalesce concurrent single-item embedding and search requests into batched calls
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Token-length bucket upper bounds; longer texts share a final bucket
+BUCKET_BOUNDARIES = (16, 32, 64, 128)
+
+class MicroBatcher(ABC):
+    """
+    Collects items submitted by request handlers and processes them together.
+
+    The first queued item opens a batch; everything already queued joins it
+    immediately, and the batch is dispatched once it holds max_batch_size items
+    or max_wait_ms has passed, whichever comes first. process_batch runs in the
+    given executor (default: the loop's default executor) so the event loop
+    stays free, and must return one result per item.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 10.0, max_pending: int = 1024,
+                 executor: Optional[Executor] = None):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "asyncio.Queue[Tuple[Any, asyncio.Future]]" = asyncio.Queue()
+        # Caps the number of items waiting for a result at any time
+        self._pending = asyncio.Semaphore(max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+        logger.info(f"{type(self).__name__} initialized with max_batch_size: {max_batch_size}, max_wait_ms: {max_wait_ms}")
+
+    def start(self) -> None:
+        """Start the background batching task"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and fail any items still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{type(self).__name__} stopped"))
+
+    async def _submit(self, item: Any) -> Any:
+        async with self._pending:
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((item, future))
+            return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for the first item, then gather more until the batch is full or the window closes"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    @abstractmethod
+    def process_batch(self, items: List[Any]) -> Sequence[Any]:
+        """Process a batch of items, returning one result per item in order"""
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        name = type(self).__name__
+        while True:
+            batch = await self._collect()
+            # Skip requests whose callers have already gone away
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.process_batch, items)
+            except Exception as e:
+                logger.error(f"{name} failed on a batch of {len(items)} items: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.debug("%s processed batch of %d items", name, len(items))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+class EmbeddingBatcher(MicroBatcher):
+    """
+    Coalesces single-text embedding requests into batched encode calls.
+
+    When length_fn is given, each batch is split into token-length buckets and
+    every bucket is encoded separately, so short texts are not padded up to
+    the longest text in the batch.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 32,
+                 max_wait_ms: float = 10.0, max_pending: int = 1024,
+                 length_fn: Optional[Callable[[List[str]], List[int]]] = None,
+                 bucket_boundaries: Sequence[int] = BUCKET_BOUNDARIES,
+                 executor: Optional[Executor] = None):
+        self.encode_fn = encode_fn
+        self.length_fn = length_fn
+        self.bucket_boundaries = tuple(bucket_boundaries)
+        super().__init__(max_batch_size, max_wait_ms, max_pending, executor)
+
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue a text and wait for its embedding (1-D float32 array)"""
+        return await self._submit(text)
+
+    def process_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode a batch, one encode call per non-empty length bucket"""
+        if self.length_fn is None or len(texts) == 1:
+            return self.encode_fn(texts)
+
+        buckets: Dict[int, List[int]] = {}
+        for position, length in enumerate(self.length_fn(texts)):
+            buckets.setdefault(bisect_left(self.bucket_boundaries, length), []).append(position)
+        if len(buckets) == 1:
+            return self.encode_fn(texts)
+
+        embeddings: Optional[np.ndarray] = None
+        for positions in buckets.values():
+            bucket_embeddings = self.encode_fn([texts[i] for i in positions])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), bucket_embeddings.shape[1]), dtype=bucket_embeddings.dtype)
+            embeddings[positions] = bucket_embeddings
+        return embeddings
+
+class SearchBatcher(MicroBatcher):
+    """
+    Coalesces single-query searches into one index search over a (B, dim)
+    query matrix. search_fn takes the query texts and the stacked embeddings
+    and returns one result per query.
+    """
+
+    def __init__(self, search_fn: Callable[[List[str], np.ndarray], List[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 0.0, max_pending: int = 1024, executor: Optional[Executor] = None):
+        self.search_fn = search_fn
+        super().__init__(max_batch_size, max_wait_ms, max_pending, executor)
+
+    async def submit(self, query: str, embedding: np.ndarray) -> Any:
+        """Queue a query with its embedding and wait for its search result"""
+        return await self._submit((query, embedding))
+
+    def process_batch(self, items: List[Tuple[str, np.ndarray]]) -> List[Any]:
+        queries = [query for query, _ in items]
+        return self.search_fn(queries, np.stack([embedding for _, embedding in items]))
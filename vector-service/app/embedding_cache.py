@@ -0,0 +1,87 @@
+"""
+Embedding Cache for the Vector Service
+Bounded LRU of text embeddings so repeated texts skip the transformer
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.cache_manager import AtomicCounter
+
+logger = logging.getLogger(__name__)
+
+def text_key(text: str) -> bytes:
+    """Fixed-size cache key for a text (16-byte BLAKE2b digest)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+class EmbeddingCache:
+    """
+    LRU mapping of text -> embedding, keyed by a 16-byte BLAKE2b digest of the
+    text so long texts are not kept alive as keys. Cached arrays are read-only;
+    callers that need to modify an embedding must copy it first.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = AtomicCounter()
+        self.misses = AtomicCounter()
+
+        logger.info(f"EmbeddingCache initialized with max_size: {max_size}")
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Get the cached embedding for a text, or None"""
+        if self.max_size <= 0:
+            return None
+
+        key = text_key(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+
+        if embedding is None:
+            self.misses.increment()
+        else:
+            self.hits.increment()
+        return embedding
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        """Cache an embedding for a text, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+
+        # Hand out a read-only view; the caller's array stays writable
+        view = embedding.view()
+        view.setflags(write=False)
+        key = text_key(text)
+        with self._lock:
+            self._entries[key] = view
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached embeddings"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding cache statistics"""
+        hits = self.hits.value
+        misses = self.misses.value
+        total = hits + misses
+        hit_rate = (hits / total * 100) if total > 0 else 0
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate_percent": round(hit_rate, 2)
+        }
@@ -0,0 +1,79 @@
+"""
+Embedding Context Codec for the Vector Service
+Reads the embeddings stored in the KB context column (written by kbManager.ts)
+"""
+
+import base64
+import binascii
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Legacy JSON contexts (~7 KB of text per 384-d vector) are parsed in worker
+# processes once there are at least this many; base64 contexts decode faster
+# than they could be shipped to a worker
+PROCESS_POOL_THRESHOLD = 4096
+PROCESS_POOL_CHUNK_SIZE = 256
+
+def parse_context(context: str, dimension: int) -> Optional[np.ndarray]:
+    """
+    Load an embedding from a context value: base64 float16 bytes, or a JSON
+    array of floats as written by older versions. Returns None when the context
+    is empty, is not a stored embedding, or has the wrong dimension.
+    """
+    try:
+        if not context or not context.strip():
+            return None
+
+        if context.lstrip().startswith("["):
+            embedding_list = orjson.loads(context)
+            if not isinstance(embedding_list, list) or not embedding_list:
+                return None
+            embedding = np.asarray(embedding_list, dtype=np.float32)
+        else:
+            raw = base64.b64decode(context, validate=True)
+            embedding = np.frombuffer(raw, dtype="<f2").astype(np.float32)
+
+        # Validate dimension
+        if embedding.ndim != 1 or len(embedding) != dimension:
+            logger.warning(f"Embedding dimension mismatch: expected {dimension}, got {embedding.shape}")
+            return None
+        return embedding
+
+    except (binascii.Error, orjson.JSONDecodeError, ValueError, TypeError) as e:
+        # Context is not a stored embedding, return None to generate new one
+        logger.debug(f"Context is not a valid stored embedding: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to load embedding from context: {e}")
+        return None
+
+def parse_contexts(contexts: List[str], dimension: int) -> List[Optional[np.ndarray]]:
+    """
+    parse_context() over many contexts, in order. Large batches of legacy JSON
+    contexts are spread over a process pool, since parsing them is CPU-bound
+    and holds the GIL; everything else is parsed inline.
+    """
+    parse = partial(parse_context, dimension=dimension)
+    legacy_count = sum(1 for context in contexts if context and context.lstrip().startswith("["))
+    workers = os.cpu_count() or 1
+    if legacy_count < PROCESS_POOL_THRESHOLD or workers < 2:
+        return [parse(context) for context in contexts]
+
+    logger.info(f"Parsing {legacy_count} JSON embedding contexts in {workers} processes")
+    try:
+        # spawn, not fork: the parent already runs FAISS/torch thread pools, and
+        # this module only needs numpy and orjson in the workers
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            return list(executor.map(parse, contexts, chunksize=PROCESS_POOL_CHUNK_SIZE))
+    except Exception as e:
+        logger.warning(f"Process pool context parsing failed, parsing inline: {e}")
+        return [parse(context) for context in contexts]
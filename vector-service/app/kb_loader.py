@@ -5,58 +5,111 @@ Handles loading existing KB data from the database
 
 import sqlite3
 import logging
-from typing import List, Optional
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 from app.models import KBEntry, DatabaseError
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per fetchmany() round-trip when loading the whole KB
+FETCH_BATCH_SIZE = 1024
+
+# IDs per "WHERE id IN (...)" query, below SQLite's default bound-parameter limit
+ID_BATCH_SIZE = 500
+
+# How long the distinct category list is served from memory before re-querying
+CATEGORIES_TTL_SECONDS = 300.0
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp from SQLite, accepting a trailing 'Z' for UTC"""
+    if not value:
+        return None
+    try:
+        if value.endswith('Z'):
+            return datetime.fromisoformat(value[:-1] + '+00:00')
+        return datetime.fromisoformat(value)
+    except (ValueError, AttributeError, TypeError):
+        # Unparseable timestamps fall back to the current time
+        return datetime.now()
+
+# Connection tuning applied once per connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-65536",  # 64 MB
+    "PRAGMA temp_store=MEMORY",
+)
+
 class KBDataLoader:
     """Loads KB data from SQLite database"""
     
+    # Statement text is kept constant so sqlite3's per-connection statement
+    # cache can reuse the compiled statement across calls
+    _SQL_SELECT = "SELECT id, category, question, context, answer, create_time, update_time FROM knowledge_base"
+    _SQL_GET_ALL = _SQL_SELECT + " ORDER BY id"
+    _SQL_GET_BY_ID = _SQL_SELECT + " WHERE id = ?"
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
+        # One persistent connection per thread (sqlite3 connections are not shared across threads)
+        self._tls = threading.local()
+        # Cached (categories, loaded_at) pair; cleared by invalidate_categories()
+        self._categories_cache: Optional[Tuple[List[str], float]] = None
         logger.info(f"KBDataLoader initialized with database: {db_path}")
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection with proper configuration"""
+        """Get this thread's database connection, opening and configuring it on first use"""
+        conn = getattr(self._tls, "conn", None)
+        if conn is not None:
+            return conn
+        
         try:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row  # Enable column access by name
-            return conn
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to database {self.db_path}: {e}")
             raise DatabaseError(f"Database connection failed: {e}")
+        
+        for pragma in CONNECTION_PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error as e:
+                # Tuning is best effort (e.g. WAL needs write access to the database directory)
+                logger.warning(f"Failed to apply '{pragma}': {e}")
+        
+        self._tls.conn = conn
+        return conn
+    
+    def close(self) -> None:
+        """Close the calling thread's database connection"""
+        conn = getattr(self._tls, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._tls.conn = None
     
     def load_all_kb_entries(self) -> List[KBEntry]:
         """Load all KB entries from the database"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Query all KB entries
-                query = """
-                    SELECT id, category, question, context, answer, create_time, update_time
-                    FROM knowledge_base
-                    ORDER BY id
-                """
-                
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                
-                kb_entries = []
+            cursor = self._get_connection().execute(self._SQL_GET_ALL)
+            cursor.arraysize = FETCH_BATCH_SIZE
+            
+            kb_entries = []
+            row_to_kb_entry = self._row_to_kb_entry
+            while rows := cursor.fetchmany():
                 for row in rows:
                     try:
-                        entry = self._row_to_kb_entry(row)
-                        kb_entries.append(entry)
+                        kb_entries.append(row_to_kb_entry(row))
                     except Exception as e:
                         logger.warning(f"Failed to process KB entry ID {row['id']}: {e}")
                         continue
-                
-                logger.info(f"Loaded {len(kb_entries)} KB entries from database")
-                return kb_entries
-                
+            
+            logger.info(f"Loaded {len(kb_entries)} KB entries from database")
+            return kb_entries
+            
         except sqlite3.Error as e:
             logger.error(f"Failed to load KB entries: {e}")
             raise DatabaseError(f"Failed to load KB entries: {e}")
@@ -67,26 +120,16 @@ class KBDataLoader:
     def get_kb_entry(self, kb_id: int) -> Optional[KBEntry]:
         """Get a specific KB entry by ID"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = """
-                    SELECT id, category, question, context, answer, create_time, update_time
-                    FROM knowledge_base
-                    WHERE id = ?
-                """
-                
-                cursor.execute(query, (kb_id,))
-                row = cursor.fetchone()
+            row = self._get_connection().execute(self._SQL_GET_BY_ID, (kb_id,)).fetchone()
+            
+            if row:
+                entry = self._row_to_kb_entry(row)
+                logger.debug(f"Retrieved KB entry ID {kb_id}")
+                return entry
+            else:
+                logger.debug(f"KB entry ID {kb_id} not found")
+                return None
                 
-                if row:
-                    entry = self._row_to_kb_entry(row)
-                    logger.debug(f"Retrieved KB entry ID {kb_id}")
-                    return entry
-                else:
-                    logger.debug(f"KB entry ID {kb_id} not found")
-                    return None
-                    
         except sqlite3.Error as e:
             logger.error(f"Failed to get KB entry {kb_id}: {e}")
             raise DatabaseError(f"Failed to get KB entry: {e}")
@@ -94,35 +137,44 @@ class KBDataLoader:
             logger.error(f"Unexpected error getting KB entry {kb_id}: {e}")
             raise DatabaseError(f"Unexpected error: {e}")
     
+    def get_kb_entries(self, kb_ids: Iterable[int]) -> Dict[int, KBEntry]:
+        """Get several KB entries by ID in as few queries as possible (missing IDs are omitted)"""
+        ids = list(kb_ids)
+        entries: Dict[int, KBEntry] = {}
+        try:
+            conn = self._get_connection()
+            for start in range(0, len(ids), ID_BATCH_SIZE):
+                batch = ids[start:start + ID_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                query = f"{self._SQL_SELECT} WHERE id IN ({placeholders})"
+                for row in conn.execute(query, batch):
+                    entry = self._row_to_kb_entry(row)
+                    entries[entry.id] = entry
+            
+            logger.debug(f"Retrieved {len(entries)} of {len(ids)} requested KB entries")
+            return entries
+            
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get KB entries: {e}")
+            raise DatabaseError(f"Failed to get KB entries: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error getting KB entries: {e}")
+            raise DatabaseError(f"Unexpected error: {e}")
+    
     def _row_to_kb_entry(self, row: sqlite3.Row) -> KBEntry:
         """Convert database row to KBEntry object"""
         try:
-            # Parse datetime strings
-            create_time = None
-            update_time = None
-            
-            if row['create_time']:
-                try:
-                    create_time = datetime.fromisoformat(row['create_time'].replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    # Try alternative parsing if needed
-                    create_time = datetime.now()
-            
-            if row['update_time']:
-                try:
-                    update_time = datetime.fromisoformat(row['update_time'].replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    # Try alternative parsing if needed
-                    update_time = datetime.now()
+            # Columns follow the SELECT order used by every KB query
+            kb_id, category, question, context, answer, create_time, update_time = row
             
             return KBEntry(
-                id=row['id'],
-                category=row['category'] or '',
-                question=row['question'] or '',
-                context=row['context'] or '',
-                answer=row['answer'] or '',
-                create_time=create_time or datetime.now(),
-                update_time=update_time or datetime.now()
+                id=kb_id,
+                category=category or '',
+                question=question or '',
+                context=context or '',
+                answer=answer or '',
+                create_time=_parse_datetime(create_time) or datetime.now(),
+                update_time=_parse_datetime(update_time) or datetime.now()
             )
             
         except Exception as e:
@@ -132,34 +184,34 @@ class KBDataLoader:
     def check_database_schema(self) -> bool:
         """Check if the database has the expected schema"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Check if knowledge_base table exists
-                cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='knowledge_base'
-                """)
-                
-                if not cursor.fetchone():
-                    logger.error("knowledge_base table not found in database")
-                    return False
-                
-                # Check table structure
-                cursor.execute("PRAGMA table_info(knowledge_base)")
-                columns = cursor.fetchall()
-                
-                required_columns = {'id', 'category', 'question', 'context', 'answer'}
-                existing_columns = {col[1] for col in columns}
-                
-                missing_columns = required_columns - existing_columns
-                if missing_columns:
-                    logger.error(f"Missing required columns: {missing_columns}")
-                    return False
-                
-                logger.info("Database schema validation passed")
-                return True
-                
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Check if knowledge_base table exists
+            cursor.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name='knowledge_base'
+            """)
+            
+            if not cursor.fetchone():
+                logger.error("knowledge_base table not found in database")
+                return False
+            
+            # Check table structure
+            cursor.execute("PRAGMA table_info(knowledge_base)")
+            columns = cursor.fetchall()
+            
+            required_columns = {'id', 'category', 'question', 'context', 'answer'}
+            existing_columns = {col[1] for col in columns}
+            
+            missing_columns = required_columns - existing_columns
+            if missing_columns:
+                logger.error(f"Missing required columns: {missing_columns}")
+                return False
+            
+            logger.debug("Database schema validation passed")
+            return True
+            
         except sqlite3.Error as e:
             logger.error(f"Database schema check failed: {e}")
             return False
@@ -170,39 +222,48 @@ class KBDataLoader:
     def get_kb_count(self) -> int:
         """Get total count of KB entries"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM knowledge_base")
-                count = cursor.fetchone()[0]
-                return count
-                
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM knowledge_base")
+            count = cursor.fetchone()[0]
+            return count
+            
         except sqlite3.Error as e:
             logger.error(f"Failed to get KB count: {e}")
             raise DatabaseError(f"Failed to get KB count: {e}")
     
     def get_kb_categories(self) -> List[str]:
-        """Get list of unique categories"""
+        """Get list of unique categories, served from memory for up to CATEGORIES_TTL_SECONDS"""
+        cached = self._categories_cache
+        if cached is not None and time.monotonic() - cached[1] < CATEGORIES_TTL_SECONDS:
+            return list(cached[0])
+        
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT DISTINCT category FROM knowledge_base WHERE category IS NOT NULL")
-                categories = [row[0] for row in cursor.fetchall()]
-                return categories
-                
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT category FROM knowledge_base WHERE category IS NOT NULL")
+            categories = [row[0] for row in cursor.fetchall()]
+            self._categories_cache = (categories, time.monotonic())
+            return list(categories)
+            
         except sqlite3.Error as e:
             logger.error(f"Failed to get KB categories: {e}")
             raise DatabaseError(f"Failed to get KB categories: {e}")
     
+    def invalidate_categories(self) -> None:
+        """Drop the cached category list so the next call re-queries the database"""
+        self._categories_cache = None
+    
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-                logger.info("Database connection test successful")
-                return True
-                
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            logger.debug("Database connection test successful")
+            return True
+            
         except Exception as e:
             logger.error(f"Database connection test failed: {e}")
             return False
\ No newline at end of file
@@ -3,34 +3,60 @@ FastAPI Vector Service Main Application
 Provides vector embedding and similarity search capabilities for KB management
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
+import asyncio
 import logging
+import sys
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Tuple
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from app.config import get_settings
-from app.vector_manager import VectorManager
+from app.config import get_settings, uvicorn_options
+from app.vector_manager import ENCODE_BATCH_SIZE, VectorManager, configure_threads
 from app.kb_loader import KBDataLoader
+from app.embedding_batcher import EmbeddingBatcher, SearchBatcher
 from app.models import (
-    VectorAddRequest, VectorUpdateRequest, VectorDeleteRequest, VectorSearchRequest,
+    VectorAddRequest, VectorAddBatchRequest, VectorUpdateRequest, VectorDeleteRequest, VectorSearchRequest,
     VectorResponse, SearchResponse, VectorServiceError
 )
 
 # Global instances
 vector_manager: VectorManager = None
 kb_loader: KBDataLoader = None
+embedding_batcher: EmbeddingBatcher = None
+search_batcher: SearchBatcher = None
+health_task: asyncio.Task = None
+
+# Blocking work runs off the event loop: SQLite calls on a small I/O pool, model
+# and FAISS work on a single thread so index updates and searches never overlap.
+# Both are created per lifespan, so the app can be started again after a shutdown
+_io_pool: ThreadPoolExecutor = None
+_cpu_pool: ThreadPoolExecutor = None
+
+async def run_blocking(pool: ThreadPoolExecutor, func, *args, **kwargs):
+    """Run a blocking call on the given pool and await its result"""
+    return await asyncio.get_running_loop().run_in_executor(pool, partial(func, *args, **kwargs))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown"""
-    global vector_manager, kb_loader
+    global vector_manager, kb_loader, embedding_batcher, search_batcher, health_task, _io_pool, _cpu_pool
     
     settings = get_settings()
     logging.info("Starting Vector Service...")
+    _io_pool = ThreadPoolExecutor(max_workers=settings.io_workers, thread_name_prefix="vector-io")
+    _cpu_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-cpu")
     
     try:
+        configure_threads(settings.faiss_threads, settings.torch_threads)
+        
         # Initialize KB data loader
         kb_loader = KBDataLoader(settings.db_path)
         
@@ -39,12 +65,45 @@ async def lifespan(app: FastAPI):
             model_name=settings.model_name,
             similarity_threshold=settings.similarity_threshold,
             index_type=settings.faiss_index_type,
-            max_cache_size=settings.max_cache_size
+            max_cache_size=settings.max_cache_size,
+            precision=settings.precision,
+            encoder_backend=settings.encoder_backend,
+            onnx_quantize=settings.onnx_quantize,
+            max_embedding_cache=settings.max_embedding_cache,
+            use_gpu_faiss=settings.use_gpu_faiss,
+            compile_model=settings.compile_model,
+            hnsw_ef_construction=settings.hnsw_ef_construction,
+            hnsw_ef_search=settings.hnsw_ef_search,
+            max_result_cache=settings.max_result_cache
         )
         
         # Load existing KB data and build index
         kb_entries = kb_loader.load_all_kb_entries()
-        await vector_manager.initialize_index(kb_entries)
+        await vector_manager.initialize_index(kb_entries, settings.index_snapshot_path or None, executor=_cpu_pool)
+        if settings.index_snapshot_path:
+            await save_index_snapshot(settings.index_snapshot_path)
+        
+        # Start batching request embeddings once the model is loaded
+        embedding_batcher = EmbeddingBatcher(
+            vector_manager.encode,
+            max_batch_size=settings.embed_max_batch_size,
+            max_wait_ms=settings.embed_max_wait_ms,
+            length_fn=vector_manager.token_lengths,
+            executor=_cpu_pool
+        )
+        embedding_batcher.start()
+        
+        # Queries embedded in the same batch reach the search batcher together,
+        # so it only drains what is already queued instead of waiting
+        search_batcher = SearchBatcher(
+            vector_manager.search_similar_batch,
+            max_batch_size=settings.embed_max_batch_size,
+            max_wait_ms=0.0,
+            executor=_cpu_pool
+        )
+        search_batcher.start()
+        
+        health_task = asyncio.create_task(_health_refresh_loop())
         
         logging.info(f"Vector Service started successfully with {len(kb_entries)} KB entries")
         
@@ -56,13 +115,58 @@ async def lifespan(app: FastAPI):
     
     # Cleanup on shutdown
     logging.info("Shutting down Vector Service...")
+    if health_task:
+        health_task.cancel()
+    if search_batcher:
+        await search_batcher.stop()
+    if embedding_batcher:
+        await embedding_batcher.stop()
+    if vector_manager and settings.index_snapshot_path:
+        await save_index_snapshot(settings.index_snapshot_path)
+    if kb_loader:
+        kb_loader.close()
+    _io_pool.shutdown(wait=False)
+    _cpu_pool.shutdown(wait=False)
+
+async def save_index_snapshot(path: str) -> None:
+    """Save the index snapshot on the CPU pool; a failed save is logged, not raised"""
+    try:
+        await run_blocking(_cpu_pool, vector_manager.save_snapshot, path)
+    except Exception as e:
+        logging.error(f"Failed to save index snapshot to {path}: {e}")
+
+async def embed_text(text: str) -> np.ndarray:
+    """Embed a single text, serving repeated texts from the embedding cache"""
+    embedding = vector_manager.embedding_cache.get(text)
+    if embedding is None:
+        embedding = await embedding_batcher.submit(text)
+        vector_manager.embedding_cache.put(text, embedding)
+    return embedding
+
+async def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Embed many texts, serving cached texts from the embedding cache. Misses are
+    encoded ENCODE_BATCH_SIZE at a time, each chunk its own CPU pool task, so
+    searches queued behind a large batch run between chunks
+    """
+    cache = vector_manager.embedding_cache
+    cached = [cache.get(text) for text in texts]
+    missing = [i for i, embedding in enumerate(cached) if embedding is None]
+    for start in range(0, len(missing), ENCODE_BATCH_SIZE):
+        chunk = missing[start:start + ENCODE_BATCH_SIZE]
+        encoded = await run_blocking(_cpu_pool, vector_manager.encode, [texts[i] for i in chunk])
+        for i, embedding in zip(chunk, encoded):
+            cache.put(texts[i], embedding)
+            cached[i] = embedding
+    return np.stack(cached)
 
 # Create FastAPI app with lifespan
 app = FastAPI(
     title="KB Vector Service",
     description="Vector embedding and similarity search service for knowledge base management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -74,124 +178,155 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Health results are rebuilt in the background and served from memory
+HEALTH_REFRESH_SECONDS = 2.0
+# Rebuild inline if the background refresh has fallen this far behind
+HEALTH_MAX_AGE_SECONDS = 5.0
+_health_cache: Dict[str, Any] = {"ts": 0.0, "payload": None}
+
+def _check_database() -> Tuple[str, Dict[str, Any]]:
+    """Run the blocking database health checks; returns (status, check)"""
+    if not kb_loader:
+        return "unhealthy", {
+            "status": "failed",
+            "message": "KB data loader not initialized"
+        }
+    
+    # Test database connection
+    if not kb_loader.test_connection():
+        return "unhealthy", {
+            "status": "failed",
+            "message": "Database connection test failed"
+        }
+    
+    # Check database schema
+    if not kb_loader.check_database_schema():
+        return "degraded", {
+            "status": "warning",
+            "message": "Database schema validation failed"
+        }
+    
+    try:
+        kb_count = kb_loader.get_kb_count()
+        return "healthy", {
+            "status": "healthy",
+            "message": "Database connection and schema OK",
+            "kb_entries_count": kb_count
+        }
+    except Exception as e:
+        return "degraded", {
+            "status": "warning",
+            "message": f"Database accessible but query failed: {str(e)}"
+        }
+
+async def _build_health_status() -> Dict[str, Any]:
+    """Build the health payload; database checks run on the I/O pool"""
+    health_status = {
+        "status": "healthy",
+        "service": "vector-service",
+        "version": "1.0.0",
+        "timestamp": datetime.now().isoformat(),
+        "checks": {}
+    }
+    
+    # Check vector manager initialization
+    if not vector_manager:
+        health_status["status"] = "unhealthy"
+        health_status["checks"]["vector_manager"] = {
+            "status": "failed",
+            "message": "Vector manager not initialized"
+        }
+        return health_status
+    
+    # Get vector manager stats
+    stats = vector_manager.get_stats()
+    health_status["index_size"] = stats["index_size"]
+    health_status["cache_size"] = stats["cache_size"]
+    health_status["embedding_dimension"] = stats["embedding_dimension"]
+    health_status["model_name"] = stats["model_name"]
+    health_status["similarity_threshold"] = stats["similarity_threshold"]
+    
+    # Check vector manager components
+    health_status["checks"]["vector_manager"] = {
+        "status": "healthy",
+        "message": "Vector manager initialized successfully"
+    }
+    
+    # Check model loading status
+    if vector_manager.sentence_transformer is None:
+        health_status["status"] = "unhealthy"
+        health_status["checks"]["model_loading"] = {
+            "status": "failed",
+            "message": "SentenceTransformer model not loaded"
+        }
+    else:
+        health_status["checks"]["model_loading"] = {
+            "status": "healthy",
+            "message": f"Model '{stats['model_name']}' loaded successfully",
+            "embedding_dimension": stats["embedding_dimension"]
+        }
+    
+    # Check FAISS index status
+    if vector_manager.faiss_index is None:
+        health_status["status"] = "unhealthy"
+        health_status["checks"]["faiss_index"] = {
+            "status": "failed",
+            "message": "FAISS index not initialized"
+        }
+    else:
+        health_status["checks"]["faiss_index"] = {
+            "status": "healthy",
+            "message": f"FAISS index initialized with {stats['index_size']} vectors",
+            "index_type": stats["index_type"],
+            "index_size": stats["index_size"]
+        }
+    
+    # Check database connectivity
+    db_status, db_check = await run_blocking(_io_pool, _check_database)
+    health_status["checks"]["database"] = db_check
+    if db_status == "unhealthy":
+        health_status["status"] = "unhealthy"
+    elif db_status == "degraded" and health_status["status"] == "healthy":
+        health_status["status"] = "degraded"
+    
+    # Add cache statistics
+    health_status["cache_stats"] = stats.get("cache_stats", {})
+    
+    return health_status
+
+async def _refresh_health() -> Dict[str, Any]:
+    payload = await _build_health_status()
+    _health_cache["payload"] = payload
+    _health_cache["ts"] = time.monotonic()
+    return payload
+
+async def _health_refresh_loop() -> None:
+    """Keep the cached health payload fresh"""
+    while True:
+        try:
+            await _refresh_health()
+        except Exception as e:
+            logging.error(f"Background health refresh failed: {e}")
+        await asyncio.sleep(HEALTH_REFRESH_SECONDS)
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint with service status and index size information
     Includes database connectivity and model loading status checks
+    Served from a snapshot refreshed every HEALTH_REFRESH_SECONDS
     """
     try:
-        health_status = {
-            "status": "healthy",
-            "service": "vector-service",
-            "version": "1.0.0",
-            "timestamp": datetime.now().isoformat(),
-            "checks": {}
-        }
-        
-        # Check vector manager initialization
-        if not vector_manager:
-            health_status["status"] = "unhealthy"
-            health_status["checks"]["vector_manager"] = {
-                "status": "failed",
-                "message": "Vector manager not initialized"
-            }
-            raise HTTPException(status_code=503, detail=health_status)
-        
-        # Get vector manager stats
-        stats = vector_manager.get_stats()
-        health_status["index_size"] = stats["index_size"]
-        health_status["cache_size"] = stats["cache_size"]
-        health_status["embedding_dimension"] = stats["embedding_dimension"]
-        health_status["model_name"] = stats["model_name"]
-        health_status["similarity_threshold"] = stats["similarity_threshold"]
-        
-        # Check vector manager components
-        health_status["checks"]["vector_manager"] = {
-            "status": "healthy",
-            "message": "Vector manager initialized successfully"
-        }
-        
-        # Check model loading status
-        if vector_manager.sentence_transformer is None:
-            health_status["status"] = "unhealthy"
-            health_status["checks"]["model_loading"] = {
-                "status": "failed",
-                "message": "SentenceTransformer model not loaded"
-            }
-        else:
-            health_status["checks"]["model_loading"] = {
-                "status": "healthy",
-                "message": f"Model '{stats['model_name']}' loaded successfully",
-                "embedding_dimension": stats["embedding_dimension"]
-            }
-        
-        # Check FAISS index status
-        if vector_manager.faiss_index is None:
-            health_status["status"] = "unhealthy"
-            health_status["checks"]["faiss_index"] = {
-                "status": "failed",
-                "message": "FAISS index not initialized"
-            }
-        else:
-            health_status["checks"]["faiss_index"] = {
-                "status": "healthy",
-                "message": f"FAISS index initialized with {stats['index_size']} vectors",
-                "index_type": stats["index_type"],
-                "index_size": stats["index_size"]
-            }
-        
-        # Check database connectivity
-        if not kb_loader:
-            health_status["status"] = "unhealthy"
-            health_status["checks"]["database"] = {
-                "status": "failed",
-                "message": "KB data loader not initialized"
-            }
-        else:
-            # Test database connection
-            db_connection_ok = kb_loader.test_connection()
-            if not db_connection_ok:
-                health_status["status"] = "unhealthy"
-                health_status["checks"]["database"] = {
-                    "status": "failed",
-                    "message": "Database connection test failed"
-                }
-            else:
-                # Check database schema
-                schema_ok = kb_loader.check_database_schema()
-                if not schema_ok:
-                    health_status["status"] = "degraded"
-                    health_status["checks"]["database"] = {
-                        "status": "warning",
-                        "message": "Database schema validation failed"
-                    }
-                else:
-                    try:
-                        kb_count = kb_loader.get_kb_count()
-                        health_status["checks"]["database"] = {
-                            "status": "healthy",
-                            "message": "Database connection and schema OK",
-                            "kb_entries_count": kb_count
-                        }
-                    except Exception as e:
-                        health_status["status"] = "degraded"
-                        health_status["checks"]["database"] = {
-                            "status": "warning",
-                            "message": f"Database accessible but query failed: {str(e)}"
-                        }
-        
-        # Add cache statistics
-        health_status["cache_stats"] = stats.get("cache_stats", {})
+        health_status = _health_cache["payload"]
+        if health_status is None or time.monotonic() - _health_cache["ts"] > HEALTH_MAX_AGE_SECONDS:
+            health_status = await _refresh_health()
         
         # Determine final status code
         if health_status["status"] == "unhealthy":
             raise HTTPException(status_code=503, detail=health_status)
-        elif health_status["status"] == "degraded":
-            # Return 200 but indicate degraded status
-            return health_status
-        else:
-            return health_status
+        
+        # Degraded still returns 200 with the status in the body
+        return health_status
             
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -207,67 +342,62 @@ async def health_check():
         }
         raise HTTPException(status_code=503, detail=error_response)
 
+@app.exception_handler(VectorServiceError)
+async def vector_service_error_handler(request: Request, exc: VectorServiceError):
+    """Report service-layer failures from any endpoint as 500 with the error message"""
+    logging.error(f"Vector service error on {request.method} {request.url.path}: {exc}")
+    return ORJSONResponse(
+        status_code=500,
+        content={"detail": f"Vector operation failed: {exc.message}", "error_code": exc.error_code}
+    )
+
+@app.exception_handler(Exception)
+async def unexpected_error_handler(request: Request, exc: Exception):
+    """Last-resort handler so endpoints do not need their own catch-all blocks"""
+    logging.error(f"Unexpected error on {request.method} {request.url.path}: {exc}")
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
+
+def _require_vector_manager() -> VectorManager:
+    if not vector_manager:
+        raise HTTPException(status_code=503, detail="Vector manager not initialized")
+    return vector_manager
+
 @app.get("/cache/stats")
 async def get_cache_stats():
     """Get cache statistics"""
-    try:
-        if not vector_manager:
-            raise HTTPException(status_code=503, detail="Vector manager not initialized")
-        
-        return vector_manager.get_cache_info()
-    except Exception as e:
-        logging.error(f"Failed to get cache stats: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get cache statistics")
+    return _require_vector_manager().get_cache_info()
 
 @app.post("/cache/cleanup")
 async def cleanup_cache():
     """Clean up expired cache entries"""
-    try:
-        if not vector_manager:
-            raise HTTPException(status_code=503, detail="Vector manager not initialized")
-        
-        expired_count = vector_manager.cleanup_cache()
-        return {
-            "success": True,
-            "expired_entries_removed": expired_count,
-            "message": f"Cleaned up {expired_count} expired cache entries"
-        }
-    except Exception as e:
-        logging.error(f"Failed to cleanup cache: {e}")
-        raise HTTPException(status_code=500, detail="Failed to cleanup cache")
+    expired_count = _require_vector_manager().cleanup_cache()
+    return {
+        "success": True,
+        "expired_entries_removed": expired_count,
+        "message": f"Cleaned up {expired_count} expired cache entries"
+    }
 
 @app.post("/cache/sync")
 async def sync_cache():
     """Synchronize cache with database"""
-    try:
-        if not vector_manager or not kb_loader:
-            raise HTTPException(status_code=503, detail="Services not initialized")
-        
-        sync_stats = vector_manager.sync_cache_with_database(kb_loader)
-        return {
-            "success": True,
-            "sync_stats": sync_stats,
-            "message": "Cache synchronization completed"
-        }
-    except Exception as e:
-        logging.error(f"Failed to sync cache: {e}")
-        raise HTTPException(status_code=500, detail="Failed to sync cache")
+    if not vector_manager or not kb_loader:
+        raise HTTPException(status_code=503, detail="Services not initialized")
+    
+    sync_stats = await run_blocking(_io_pool, vector_manager.sync_cache_with_database, kb_loader)
+    return {
+        "success": True,
+        "sync_stats": sync_stats,
+        "message": "Cache synchronization completed"
+    }
 
 @app.delete("/cache/{kb_id}")
 async def invalidate_cache_entry(kb_id: int):
     """Invalidate cache entry for specific KB ID"""
-    try:
-        if not vector_manager:
-            raise HTTPException(status_code=503, detail="Vector manager not initialized")
-        
-        vector_manager.invalidate_cache_entry(kb_id)
-        return {
-            "success": True,
-            "message": f"Cache entry for KB ID {kb_id} invalidated"
-        }
-    except Exception as e:
-        logging.error(f"Failed to invalidate cache entry {kb_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to invalidate cache entry")
+    _require_vector_manager().invalidate_cache_entry(kb_id)
+    return {
+        "success": True,
+        "message": f"Cache entry for KB ID {kb_id} invalidated"
+    }
 
 
 
@@ -279,62 +409,54 @@ async def add_vector(request: VectorAddRequest):
     Add new vector data to the FAISS index
     Generates embeddings for the provided text and stores in the vector index
     """
-    try:
-        if not vector_manager:
-            raise HTTPException(
-                status_code=503, 
-                detail="Vector manager not initialized"
-            )
-        
-        # Validate request data
-        if not request.input_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Input text cannot be empty"
-            )
-        
-        if not request.answer.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Answer cannot be empty"
-            )
-        
-        if request.id <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail="KB ID must be a positive integer"
-            )
-        
-        # Add vector to index
-        vector_data = vector_manager.add_vector(
-            kb_id=request.id,
-            text=request.input_text,
-            answer=request.answer
-        )
-        
-        logging.info(f"Successfully added vector for KB ID {request.id}")
-        
-        return VectorResponse(
+    manager = _require_vector_manager()
+    
+    # Add vector to index
+    embedding = await embed_text(request.input_text)
+    vector_data = await run_blocking(
+        _cpu_pool,
+        manager.add_vector,
+        kb_id=request.id,
+        text=request.input_text,
+        answer=request.answer,
+        embedding=embedding
+    )
+    
+    logging.info(f"Successfully added vector for KB ID {request.id}")
+    
+    return VectorResponse.model_construct(
+        success=True,
+        message=f"Vector added successfully for KB ID {request.id}",
+        vector_data=vector_data.tolist() if vector_data is not None else None
+    )
+
+@app.post("/vectors/add_batch", response_model=List[VectorResponse])
+async def add_vectors_batch(request: VectorAddBatchRequest):
+    """
+    Add many vectors to the FAISS index in one call
+    Embeds all texts in a single batch and inserts them with one index update
+    """
+    manager = _require_vector_manager()
+    
+    # Add vectors to index
+    embeddings = await embed_texts([item.input_text for item in request.items])
+    vector_data = await run_blocking(
+        _cpu_pool,
+        manager.add_vectors,
+        [(item.id, item.input_text, item.answer) for item in request.items],
+        embeddings
+    )
+    
+    logging.info(f"Successfully added batch of {len(request.items)} vectors")
+    
+    return [
+        VectorResponse.model_construct(
             success=True,
-            message=f"Vector added successfully for KB ID {request.id}",
-            vector_data=vector_data.tolist() if vector_data is not None else None
-        )
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except VectorServiceError as e:
-        logging.error(f"Vector service error adding vector for KB ID {request.id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Vector operation failed: {e.message}"
-        )
-    except Exception as e:
-        logging.error(f"Unexpected error adding vector for KB ID {request.id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to add vector data"
+            message=f"Vector added successfully for KB ID {item.id}",
+            vector_data=embedding.tolist()
         )
+        for item, embedding in zip(request.items, vector_data)
+    ]
 
 @app.put("/vectors/update", response_model=VectorResponse)
 async def update_vector(request: VectorUpdateRequest):
@@ -342,62 +464,26 @@ async def update_vector(request: VectorUpdateRequest):
     Update existing vector data in the FAISS index
     Regenerates embeddings for the updated text content
     """
-    try:
-        if not vector_manager:
-            raise HTTPException(
-                status_code=503,
-                detail="Vector manager not initialized"
-            )
-        
-        # Validate request data
-        if not request.input_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Input text cannot be empty"
-            )
-        
-        if not request.answer.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Answer cannot be empty"
-            )
-        
-        if request.id <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail="KB ID must be a positive integer"
-            )
-        
-        # Update vector in index
-        vector_data = vector_manager.update_vector(
-            kb_id=request.id,
-            text=request.input_text,
-            answer=request.answer
-        )
-        
-        logging.info(f"Successfully updated vector for KB ID {request.id}")
-        
-        return VectorResponse(
-            success=True,
-            message=f"Vector updated successfully for KB ID {request.id}",
-            vector_data=vector_data.tolist() if vector_data is not None else None
-        )
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except VectorServiceError as e:
-        logging.error(f"Vector service error updating vector for KB ID {request.id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Vector operation failed: {e.message}"
-        )
-    except Exception as e:
-        logging.error(f"Unexpected error updating vector for KB ID {request.id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to update vector data"
-        )
+    manager = _require_vector_manager()
+    
+    # Update vector in index
+    embedding = await embed_text(request.input_text)
+    vector_data = await run_blocking(
+        _cpu_pool,
+        manager.update_vector,
+        kb_id=request.id,
+        text=request.input_text,
+        answer=request.answer,
+        embedding=embedding
+    )
+    
+    logging.info(f"Successfully updated vector for KB ID {request.id}")
+    
+    return VectorResponse.model_construct(
+        success=True,
+        message=f"Vector updated successfully for KB ID {request.id}",
+        vector_data=vector_data.tolist() if vector_data is not None else None
+    )
 
 @app.delete("/vectors/delete", response_model=VectorResponse)
 async def delete_vector(request: VectorDeleteRequest):
@@ -405,51 +491,18 @@ async def delete_vector(request: VectorDeleteRequest):
     Delete vector data from the FAISS index
     Removes the vector associated with the specified KB ID
     """
-    try:
-        if not vector_manager:
-            raise HTTPException(
-                status_code=503,
-                detail="Vector manager not initialized"
-            )
-        
-        # Validate request data
-        if request.id <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail="KB ID must be a positive integer"
-            )
-        
-        # Delete vector from index
-        success = vector_manager.delete_vector(kb_id=request.id)
-        
-        if success:
-            logging.info(f"Successfully deleted vector for KB ID {request.id}")
-            return VectorResponse(
-                success=True,
-                message=f"Vector deleted successfully for KB ID {request.id}"
-            )
-        else:
-            logging.warning(f"Vector for KB ID {request.id} not found for deletion")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Vector for KB ID {request.id} not found"
-            )
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except VectorServiceError as e:
-        logging.error(f"Vector service error deleting vector for KB ID {request.id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Vector operation failed: {e.message}"
-        )
-    except Exception as e:
-        logging.error(f"Unexpected error deleting vector for KB ID {request.id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to delete vector data"
-        )
+    manager = _require_vector_manager()
+    
+    # Delete vector from index
+    if not await run_blocking(_cpu_pool, manager.delete_vector, kb_id=request.id):
+        logging.warning(f"Vector for KB ID {request.id} not found for deletion")
+        raise HTTPException(status_code=404, detail=f"Vector for KB ID {request.id} not found")
+    
+    logging.info(f"Successfully deleted vector for KB ID {request.id}")
+    return VectorResponse.model_construct(
+        success=True,
+        message=f"Vector deleted successfully for KB ID {request.id}"
+    )
 
 @app.post("/vectors/search", response_model=SearchResponse)
 async def search_similar_vectors(request: VectorSearchRequest):
@@ -457,115 +510,93 @@ async def search_similar_vectors(request: VectorSearchRequest):
     Search for similar vectors using FAISS similarity search
     Returns the most similar KB entry if similarity score exceeds threshold
     """
-    try:
-        if not vector_manager:
-            raise HTTPException(
-                status_code=503,
-                detail="Vector manager not initialized"
-            )
-        
-        # Validate request data
-        if not request.query.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Search query cannot be empty"
-            )
-        
-        # Perform similarity search
-        result = vector_manager.search_similar(request.query)
-        
-        if result is None:
-            # No match found or similarity below threshold
-            logging.info(f"No similar content found for query: '{request.query[:50]}...'")
-            return SearchResponse(
-                success=True,
-                match_found=False,
-                message="No similar content found above similarity threshold"
-            )
-        
-        # Match found
-        logging.info(f"Found similar content for query: KB ID {result.kb_id}, score {result.similarity_score}")
-        
-        return SearchResponse(
+    _require_vector_manager()
+    
+    # Perform similarity search
+    query_embedding = await embed_text(request.query)
+    result = await search_batcher.submit(request.query, query_embedding)
+    
+    if result is None:
+        # No match found or similarity below threshold
+        logging.debug("No similar content found for query: %.50r", request.query)
+        return SearchResponse.model_construct(
             success=True,
-            match_found=True,
-            similarity_score=result.similarity_score,
-            kb_id=result.kb_id,
-            answer=result.answer,
-            message=f"Found similar content with {result.confidence_level} confidence"
-        )
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except VectorServiceError as e:
-        logging.error(f"Vector service error during search: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Search operation failed: {e.message}"
-        )
-    except Exception as e:
-        logging.error(f"Unexpected error during similarity search: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to perform similarity search"
+            match_found=False,
+            message="No similar content found above similarity threshold"
         )
+    
+    # Match found
+    logging.debug("Found similar content for query: KB ID %s, score %s", result.kb_id, result.similarity_score)
+    
+    return SearchResponse.model_construct(
+        success=True,
+        match_found=True,
+        similarity_score=result.similarity_score,
+        kb_id=result.kb_id,
+        answer=result.answer,
+        message=f"Found similar content with {result.confidence_level} confidence"
+    )
+
+def _binary_embedding_response(embedding: np.ndarray, response_format: str) -> Response:
+    """
+    Pack an embedding as little-endian bytes.
+    f16: dim float16 values.
+    i8: a float32 scale followed by dim int8 values; value = int8 * scale.
+    """
+    if response_format == "f16":
+        content = embedding.astype("<f2").tobytes()
+        dtype = "float16"
+    else:
+        peak = float(np.max(np.abs(embedding))) if embedding.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        quantized = np.clip(np.rint(embedding / scale), -127, 127).astype(np.int8)
+        content = np.array([scale], dtype="<f4").tobytes() + quantized.tobytes()
+        dtype = "int8"
+    
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={
+            "X-Embedding-Dtype": dtype,
+            "X-Embedding-Dim": str(embedding.shape[0])
+        }
+    )
 
 @app.post("/vectors/embed")
-async def generate_embedding(request: dict):
+async def generate_embedding(
+    request: dict,
+    response_format: str = Query("json", alias="format", pattern="^(json|f16|i8)$")
+):
     """
     Generate embedding vector for given text
-    Returns the embedding vector as a list of floats
+    Returns the embedding vector as a list of floats, or as raw bytes with ?format=f16|i8
+    The JSON form serializes the numpy array directly with orjson
     """
-    try:
-        if not vector_manager:
-            raise HTTPException(
-                status_code=503,
-                detail="Vector service not initialized"
-            )
-        
-        text = request.get("text", "")
-        if not text or not text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Text is required for embedding generation"
-            )
-        
-        # Generate embedding using the sentence transformer
-        if not vector_manager.sentence_transformer:
-            raise HTTPException(
-                status_code=503,
-                detail="SentenceTransformer model not loaded"
-            )
-        
-        # Generate embedding
-        embedding = vector_manager.sentence_transformer.encode([text], convert_to_numpy=True)
-        
-        # Normalize for cosine similarity if using IndexFlatIP
-        if vector_manager.index_type == "IndexFlatIP":
-            import faiss
-            faiss.normalize_L2(embedding)
-        
-        # Convert to list for JSON serialization
-        embedding_list = embedding[0].tolist()
-        
-        logging.info(f"Generated embedding with {len(embedding_list)} dimensions for text: {text[:50]}...")
-        
-        return {
-            "success": True,
-            "embedding": embedding_list,
-            "dimension": len(embedding_list),
-            "text_length": len(text)
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Unexpected error during embedding generation: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to generate embedding"
-        )
+    if not vector_manager:
+        raise HTTPException(status_code=503, detail="Vector service not initialized")
+    
+    text = request.get("text", "")
+    if not text or not text.strip():
+        raise HTTPException(status_code=400, detail="Text is required for embedding generation")
+    
+    if not vector_manager.sentence_transformer:
+        raise HTTPException(status_code=503, detail="SentenceTransformer model not loaded")
+    
+    # Generate embedding (normalized for cosine similarity unless using IndexFlatL2)
+    embedding = await embed_text(text)
+    
+    if response_format != "json":
+        logging.info(f"Generated {response_format} embedding with {embedding.shape[0]} dimensions for text: {text[:50]}...")
+        return _binary_embedding_response(embedding, response_format)
+    
+    logging.info(f"Generated embedding with {embedding.shape[0]} dimensions for text: {text[:50]}...")
+    
+    return ORJSONResponse({
+        "success": True,
+        "embedding": embedding,
+        "dimension": embedding.shape[0],
+        "text_length": len(text)
+    })
 
 if __name__ == "__main__":
     try:
@@ -593,15 +624,19 @@ if __name__ == "__main__":
                 host=settings.host,
                 port=settings.port,
                 reload=True,
-                log_level=settings.log_level.lower()
+                log_level=settings.log_level.lower(),
+                **uvicorn_options(settings)
             )
         else:
             print("🚀 Running in PRODUCTION mode")
+            # Multiple workers need an import string so each process can load the app
             uvicorn.run(
-                app,
+                "app.main:app" if settings.workers > 1 else app,
                 host=settings.host,
                 port=settings.port,
-                reload=False
+                reload=False,
+                workers=settings.workers,
+                **uvicorn_options(settings)
             )
             
     except KeyboardInterrupt:
@@ -609,5 +644,4 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"❌ Failed to start service: {e}")
         logging.exception("Service startup failed")
-        import sys
         sys.exit(1)
\ No newline at end of file
@@ -3,31 +3,61 @@ Data models for Vector Service
 Defines request/response models and internal data structures
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt, StringConstraints, field_validator
 from datetime import datetime
 import numpy as np
 
+# Longest text accepted in a request; the model truncates far below this anyway
+MAX_TEXT_LENGTH = 8192
+
+# Most items accepted in one batch add request
+MAX_BATCH_ITEMS = 256
+
+# Stripped, non-empty request text, enforced by pydantic-core before handlers run
+RequestText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=MAX_TEXT_LENGTH)]
+
+# Answers are stored and returned verbatim, never embedded, so only emptiness is rejected
+AnswerText = Annotated[str, StringConstraints(min_length=1)]
+
 # Request Models
-class VectorAddRequest(BaseModel):
+class RequestModel(BaseModel):
+    """Base for request bodies: unknown fields are rejected"""
+    model_config = ConfigDict(extra="forbid")
+
+class VectorAddRequest(RequestModel):
     """Request model for adding new vector data"""
-    id: int = Field(..., description="KB entry ID")
-    input_text: str = Field(..., description="Input text to vectorize")
-    answer: str = Field(..., description="Answer content")
+    id: PositiveInt = Field(..., description="KB entry ID")
+    input_text: RequestText = Field(..., description="Input text to vectorize")
+    answer: AnswerText = Field(..., description="Answer content")
 
-class VectorUpdateRequest(BaseModel):
+class VectorAddBatchRequest(RequestModel):
+    """Request model for adding many vectors in one call"""
+    items: List[VectorAddRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="Vector data to add")
+    
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items: List[VectorAddRequest]) -> List[VectorAddRequest]:
+        seen_ids = set()
+        for item in items:
+            if item.id in seen_ids:
+                raise ValueError(f"Duplicate KB ID {item.id} in batch")
+            seen_ids.add(item.id)
+        return items
+
+class VectorUpdateRequest(RequestModel):
     """Request model for updating existing vector data"""
-    id: int = Field(..., description="KB entry ID")
-    input_text: str = Field(..., description="Updated input text")
-    answer: str = Field(..., description="Updated answer content")
+    id: PositiveInt = Field(..., description="KB entry ID")
+    input_text: RequestText = Field(..., description="Updated input text")
+    answer: AnswerText = Field(..., description="Updated answer content")
 
-class VectorDeleteRequest(BaseModel):
+class VectorDeleteRequest(RequestModel):
     """Request model for deleting vector data"""
-    id: int = Field(..., description="KB entry ID to delete")
+    id: PositiveInt = Field(..., description="KB entry ID to delete")
 
-class VectorSearchRequest(BaseModel):
+class VectorSearchRequest(RequestModel):
     """Request model for similarity search"""
-    query: str = Field(..., description="Search query text")
+    query: RequestText = Field(..., description="Search query text")
 
 # Response Models
 class VectorResponse(BaseModel):
@@ -94,6 +124,112 @@ class VectorData:
             "embedding_shape": self.embedding.shape if self.embedding is not None else None
         }
 
+class VectorStore:
+    """
+    Structure-of-arrays store for indexed vectors: one contiguous float32 matrix
+    plus parallel id/text/answer columns, instead of one VectorData per entry.
+    It is the source the FAISS index is (re)built and trained from; VectorData
+    objects returned by get() are transient views.
+    """
+    INITIAL_CAPACITY = 1024
+    
+    def __init__(self, dimension: int, capacity: int = INITIAL_CAPACITY):
+        capacity = max(capacity, 1)
+        self.dimension = dimension
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.embeddings = np.empty((capacity, dimension), dtype=np.float32)
+        self.texts: List[str] = []
+        self.answers: List[str] = []
+        self._rows: Dict[int, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __contains__(self, kb_id: int) -> bool:
+        return kb_id in self._rows
+    
+    def _reserve(self, size: int) -> None:
+        """Grow capacity geometrically so appends are amortized O(1)"""
+        capacity = self.ids.shape[0]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        
+        count = len(self)
+        ids = np.empty(capacity, dtype=np.int64)
+        ids[:count] = self.ids[:count]
+        embeddings = np.empty((capacity, self.dimension), dtype=np.float32)
+        embeddings[:count] = self.embeddings[:count]
+        self.ids = ids
+        self.embeddings = embeddings
+    
+    def append(self, kb_id: int, embedding: np.ndarray, text: str, answer: str) -> int:
+        """Append a vector and return its row"""
+        return self.extend([kb_id], embedding.reshape(1, -1), [text], [answer])
+    
+    def extend(self, kb_ids: List[int], embeddings: np.ndarray, texts: List[str], answers: List[str]) -> int:
+        """Append many vectors and return the first new row"""
+        start = len(self)
+        end = start + len(kb_ids)
+        self._reserve(end)
+        self.ids[start:end] = kb_ids
+        self.embeddings[start:end] = embeddings
+        self.texts.extend(texts)
+        self.answers.extend(answers)
+        for row, kb_id in enumerate(kb_ids, start):
+            self._rows[kb_id] = row
+        return start
+    
+    def set(self, kb_id: int, embedding: np.ndarray, text: str, answer: str) -> int:
+        """Overwrite an existing vector in place and return its row"""
+        row = self._rows[kb_id]
+        self.embeddings[row] = embedding
+        self.texts[row] = text
+        self.answers[row] = answer
+        return row
+    
+    def remove(self, kb_id: int) -> bool:
+        """Remove a vector by moving the last row into its slot; rows after it are unaffected"""
+        row = self._rows.pop(kb_id, None)
+        if row is None:
+            return False
+        
+        last = len(self) - 1
+        if row != last:
+            moved_id = int(self.ids[last])
+            self.ids[row] = moved_id
+            self.embeddings[row] = self.embeddings[last]
+            self.texts[row] = self.texts[last]
+            self.answers[row] = self.answers[last]
+            self._rows[moved_id] = row
+        self.texts.pop()
+        self.answers.pop()
+        return True
+    
+    def row_of(self, kb_id: int) -> Optional[int]:
+        return self._rows.get(kb_id)
+    
+    def vectors(self) -> np.ndarray:
+        """Contiguous (len, dimension) view of the stored embeddings"""
+        return self.embeddings[:len(self)]
+    
+    def id_array(self) -> np.ndarray:
+        """View of the stored KB IDs in row order"""
+        return self.ids[:len(self)]
+    
+    def get(self, kb_id: int) -> Optional[VectorData]:
+        """Transient VectorData view of a stored vector"""
+        row = self._rows.get(kb_id)
+        if row is None:
+            return None
+        return VectorData(kb_id, self.embeddings[row], self.texts[row], self.answers[row])
+    
+    def clear(self) -> None:
+        self.texts.clear()
+        self.answers.clear()
+        self._rows.clear()
+
 class SimilarityResult:
     """Internal model for similarity search results"""
     def __init__(self, kb_id: int, similarity_score: float, answer: str, confidence_level: str):
@@ -0,0 +1,128 @@
+"""
+ONNX Runtime Encoder for the Vector Service
+Runs the sentence-transformer as an exported ONNX graph for faster CPU inference
+"""
+
+import logging
+import os
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Files written next to the exported model: ORTOptimizer's graph-optimized model,
+# and ORTQuantizer's INT8 version of it
+OPTIMIZED_FILE_NAME = "model_optimized.onnx"
+QUANTIZED_FILE_NAME = "model_optimized_quantized.onnx"
+
+class OnnxEncoder:
+    """
+    Mean-pooled sentence embeddings from an ONNX Runtime feature-extraction model.
+
+    Requires the optional `optimum[onnxruntime]` package; use load() to get
+    None instead of an ImportError when it is not installed.
+    """
+
+    def __init__(self, model, tokenizer, max_seq_length: int, normalize: bool):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self.normalize = normalize
+
+    @classmethod
+    def load(cls, model_name: str, max_seq_length: int, normalize: bool,
+             cache_folder: Optional[str] = None, quantize: bool = False) -> Optional["OnnxEncoder"]:
+        """
+        Export the model to ONNX and open a CPU session, or return None if optimum is unavailable.
+        The exported graph is optimized (operator fusion, level 99) and, with quantize=True, its
+        Linear layers are dynamically quantized to INT8; the result is kept on disk and reused
+        on later startups.
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            logger.warning(f"ONNX encoder requested but optimum[onnxruntime] is not installed: {e}")
+            return None
+
+        export_dir = os.path.join(cache_folder or tempfile.gettempdir(), "onnx", model_name.replace("/", "__"))
+        file_name = QUANTIZED_FILE_NAME if quantize else OPTIMIZED_FILE_NAME
+        if os.path.exists(os.path.join(export_dir, file_name)):
+            logger.info(f"Loading {file_name} from {export_dir}")
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                export_dir, file_name=file_name, provider="CPUExecutionProvider"
+            )
+        else:
+            logger.info(f"Exporting {model_name} to ONNX for CPU inference")
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider="CPUExecutionProvider", cache_dir=cache_folder
+            )
+            model = cls._optimize(model, export_dir)
+            if quantize:
+                model = cls._quantize(model, export_dir)
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_folder)
+        return cls(model, tokenizer, max_seq_length, normalize)
+
+    @staticmethod
+    def _optimize(model, export_dir: str):
+        """Apply ONNX Runtime graph optimizations (attention/GELU/LayerNorm fusion) and load the result"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer
+        from optimum.onnxruntime.configuration import OptimizationConfig
+
+        logger.info(f"Optimizing ONNX graph in {export_dir}")
+        model.save_pretrained(export_dir)
+        try:
+            optimizer = ORTOptimizer.from_pretrained(model)
+            optimizer.optimize(
+                save_dir=export_dir,
+                optimization_config=OptimizationConfig(optimization_level=99, optimize_for_gpu=False)
+            )
+        except Exception as e:
+            # Graph fusion only knows common architectures; the plain export still works
+            logger.warning(f"ONNX graph optimization failed, using the unoptimized export: {e}")
+            return model
+        return ORTModelForFeatureExtraction.from_pretrained(
+            export_dir, file_name=OPTIMIZED_FILE_NAME, provider="CPUExecutionProvider"
+        )
+
+    @staticmethod
+    def _quantize(model, export_dir: str):
+        """Apply INT8 dynamic quantization (VNNI dot-product kernels) and load the result"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        logger.info(f"Quantizing ONNX model to INT8 in {export_dir}")
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=export_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        # ORTQuantizer names its output after the input file, which is the plain
+        # export when optimization failed; rename it so load() finds it next time
+        quantized_path = os.path.join(export_dir, f"{model.model_path.stem}_quantized.onnx")
+        os.replace(quantized_path, os.path.join(export_dir, QUANTIZED_FILE_NAME))
+        return ORTModelForFeatureExtraction.from_pretrained(
+            export_dir, file_name=QUANTIZED_FILE_NAME, provider="CPUExecutionProvider"
+        )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 array"""
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np"
+        )
+        hidden = self.model(**inputs).last_hidden_state
+
+        # Mean pooling over real tokens only; the masked sum is one batched
+        # (1, tokens) x (tokens, dim) matmul, with no (batch, tokens, dim) temporary
+        mask = inputs["attention_mask"].astype(np.float32)
+        embeddings = np.matmul(mask[:, None, :], hidden)[:, 0] / np.clip(mask.sum(axis=1, keepdims=True), 1e-9, None)
+        embeddings = embeddings.astype(np.float32, copy=False)
+
+        if self.normalize:
+            # Row norms in a single pass over the embeddings
+            norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))[:, None]
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings
@@ -0,0 +1,93 @@
+"""
+Search Result Cache for the Vector Service
+Bounded LRU of similarity search results so repeated queries skip FAISS
+"""
+
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from app.cache_manager import AtomicCounter
+from app.embedding_cache import text_key
+from app.models import SimilarityResult
+
+logger = logging.getLogger(__name__)
+
+class SearchResultCache:
+    """
+    LRU mapping of query text -> best match (or None for "no match"), keyed
+    by text_key like EmbeddingCache. Results are only valid for the index and
+    KB cache they were computed against, so every change must call clear().
+
+    clear() bumps a generation counter; put() drops results computed before
+    the last clear, so a search racing with an index change cannot store a
+    stale answer.
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Optional[SimilarityResult]]" = OrderedDict()
+        self._lock = Lock()
+        self._generation = 0
+        self.hits = AtomicCounter()
+        self.misses = AtomicCounter()
+
+        logger.info(f"SearchResultCache initialized with max_size: {max_size}")
+
+    @property
+    def generation(self) -> int:
+        """Generation to pass to put() for results computed from now on"""
+        return self._generation
+
+    def get(self, query: str) -> Tuple[bool, Optional[SimilarityResult]]:
+        """Get (found, result) for a query; result may be None for a cached "no match" """
+        if self.max_size <= 0:
+            return False, None
+
+        key = text_key(query)
+        with self._lock:
+            found = key in self._entries
+            result = self._entries.get(key)
+            if found:
+                self._entries.move_to_end(key)
+
+        if found:
+            self.hits.increment()
+        else:
+            self.misses.increment()
+        return found, result
+
+    def put(self, query: str, result: Optional[SimilarityResult], generation: int) -> None:
+        """Cache a result computed at the given generation, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+
+        key = text_key(query)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get search result cache statistics"""
+        hits = self.hits.value
+        misses = self.misses.value
+        total = hits + misses
+        hit_rate = (hits / total * 100) if total > 0 else 0
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate_percent": round(hit_rate, 2)
+        }
@@ -3,44 +3,149 @@ Vector Manager for FAISS operations and SentenceTransformer integration
 Handles vector embedding generation and similarity search
 """
 
+import asyncio
 import logging
+import contextlib
+import json
+import os
 import numpy as np
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Set, Tuple
 import faiss
+import torch
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.models import Normalize, Pooling, Transformer
 
-from app.models import KBEntry, VectorData, SimilarityResult, ModelLoadError, IndexError
+from app.models import KBEntry, VectorData, VectorStore, SimilarityResult, ModelLoadError, IndexError
 from app.cache_manager import VectorCacheManager
+from app.onnx_encoder import OnnxEncoder
+from app.embedding_cache import EmbeddingCache
+from app.embedding_context import parse_contexts
+from app.result_cache import SearchResultCache
 
 logger = logging.getLogger(__name__)
 
+# Supported transformer inference precisions; embeddings handed to FAISS are always float32
+PRECISIONS = ("fp32", "fp16", "bf16")
+
+# Encoder backends; "onnx" falls back to "torch" when the model or runtime is unsupported
+ENCODER_BACKENDS = ("torch", "onnx")
+
+# Legacy index type names mapped to index_factory descriptions; any other value
+# is passed to faiss.index_factory as-is (e.g. "HNSW32", "IVF256,PQ32")
+LEGACY_INDEX_TYPES = {"IndexFlatIP": "Flat", "IndexFlatL2": "Flat", "IndexHNSWFlat": "HNSW32"}
+
+# Largest batch run through the model in one forward pass; bigger inputs are
+# split so a single request cannot allocate an unbounded activation tensor
+ENCODE_BATCH_SIZE = 64
+
+# Batch sizes encoded once after torch.compile so the common shapes are compiled at startup
+COMPILE_WARMUP_BATCH_SIZES = (1, 4, 8, 16, 32)
+
+# Files written next to an index snapshot: the stored embeddings and a JSON
+# sidecar (model, index type, IDs and texts) that marks the snapshot complete
+SNAPSHOT_EMBEDDINGS_SUFFIX = ".npy"
+SNAPSHOT_META_SUFFIX = ".json"
+
+# Indexes that cannot remove vectors (HNSW) take updates and deletes through a
+# small flat delta index plus a set of stale main-index IDs; the main index is
+# rebuilt from the store once the two together reach this size
+DELTA_INDEX_MAX_SIZE = 256
+
+def _cpu_has_avx512() -> bool:
+    """Whether the CPU advertises AVX-512F (read from /proc/cpuinfo, so Linux only)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            return any(line.startswith("flags") and " avx512f" in line for line in f)
+    except OSError:
+        return False
+
+def configure_threads(faiss_threads: int = 0, torch_threads: int = 0) -> None:
+    """
+    Set the FAISS OpenMP and torch intra-op thread counts (0 keeps the library
+    default), log which SIMD level the loaded FAISS build dispatches to, and
+    warn when that build leaves the CPU's AVX-512 unused
+    """
+    if faiss_threads > 0:
+        faiss.omp_set_num_threads(faiss_threads)
+    if torch_threads > 0:
+        torch.set_num_threads(torch_threads)
+    
+    compile_options = faiss.get_compile_options().strip()
+    logger.info(f"FAISS compile options: {compile_options}")
+    if "AVX512" not in compile_options and _cpu_has_avx512():
+        # Flat search distance kernels run up to ~2x faster with AVX-512
+        logger.warning(
+            "CPU supports AVX-512 but the loaded FAISS build does not use it; install a faiss-cpu "
+            "wheel with the AVX-512 variant or build FAISS with -DFAISS_OPT_LEVEL=avx512"
+        )
+    logger.info(f"Threads: faiss={faiss.omp_get_max_threads()}, torch={torch.get_num_threads()}")
+
 class VectorManager:
     """Manages FAISS vector indices and embedding operations"""
     
     def __init__(self, model_name: str, similarity_threshold: float, index_type: str = "IndexFlatIP", 
-                 max_cache_size: int = 1000):
+                 max_cache_size: int = 1000, precision: str = "fp32", encoder_backend: str = "torch",
+                 onnx_quantize: bool = False, max_embedding_cache: int = 1024, use_gpu_faiss: bool = False,
+                 compile_model: bool = False, hnsw_ef_construction: int = 200, hnsw_ef_search: int = 64,
+                 max_result_cache: int = 512):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Precision must be one of {PRECISIONS}, got {precision!r}")
+        if encoder_backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Encoder backend must be one of {ENCODER_BACKENDS}, got {encoder_backend!r}")
+        
         self.model_name = model_name
         self.similarity_threshold = similarity_threshold
         self.index_type = index_type
+        # Only the legacy IndexFlatL2 type uses L2 distance; everything else is
+        # inner product over L2-normalized embeddings (cosine similarity)
+        self.metric = faiss.METRIC_L2 if index_type == "IndexFlatL2" else faiss.METRIC_INNER_PRODUCT
+        # Whether encode() must L2-normalize itself; decided once the model is
+        # loaded, since models ending in a Normalize module already do it
+        self.normalize_embeddings = False
+        self.use_gpu_faiss = use_gpu_faiss
+        # HNSW graph build and search breadth (FAISS defaults of 40/16 trade too much recall)
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.precision = precision
+        self.encoder_backend = encoder_backend
+        self.onnx_quantize = onnx_quantize
+        self.compile_model = compile_model
         
         # Initialize components
         self.sentence_transformer: Optional[SentenceTransformer] = None
+        self.onnx_encoder: Optional[OnnxEncoder] = None
         self.faiss_index: Optional[faiss.Index] = None
+        # Index type actually built: "Flat" when index_type is unknown or could not be trained
+        self.built_index_type: Optional[str] = None
+        # Vectors written since the main index stopped accepting removals, and
+        # the main-index IDs they (or deletes) superseded; reset on every rebuild
+        self.delta_index: Optional[faiss.Index] = None
+        self.stale_ids: Set[int] = set()
         self.cache_manager = VectorCacheManager(max_cache_size=max_cache_size)
-        self.id_to_index_map: Dict[int, int] = {}  # Maps KB ID to FAISS index position
-        self.index_to_id_map: Dict[int, int] = {}  # Maps FAISS index position to KB ID
+        self.embedding_cache = EmbeddingCache(max_size=max_embedding_cache)
+        # Cleared on every index or KB cache change
+        self.result_cache = SearchResultCache(max_size=max_result_cache)
         self.embedding_dimension: int = 384  # Default for all-MiniLM-L6-v2
+        # Indexed vectors (FAISS keys them by KB ID); recreated once the model dimension is known
+        self.vector_store = VectorStore(self.embedding_dimension)
         
         logger.info(f"VectorManager initialized with model: {model_name}, cache_size: {max_cache_size}")
     
-    async def initialize_index(self, kb_entries: List[KBEntry]) -> None:
-        """Initialize FAISS index and load existing KB data"""
+    async def initialize_index(self, kb_entries: List[KBEntry], snapshot_path: Optional[str] = None,
+                               executor: Optional[Executor] = None) -> None:
+        """
+        Initialize FAISS index and load existing KB data.
+        With snapshot_path, embeddings of entries whose text is unchanged since the
+        last save_snapshot() are reused instead of being encoded again. Entries that
+        need encoding are encoded on executor (the default executor if None).
+        """
         try:
             # Load SentenceTransformer model
             logger.info(f"Loading SentenceTransformer model: {self.model_name}")
             
             # Set cache directory if specified in environment
-            import os
             if os.environ.get('SENTENCE_TRANSFORMERS_HOME'):
                 cache_folder = os.environ.get('SENTENCE_TRANSFORMERS_HOME')
                 logger.info(f"Using custom cache folder: {cache_folder}")
@@ -48,18 +153,32 @@ class VectorManager:
             else:
                 self.sentence_transformer = SentenceTransformer(self.model_name)
             
-            # Get actual embedding dimension from model
-            test_embedding = self.sentence_transformer.encode(["test"])
-            self.embedding_dimension = test_embedding.shape[1]
+            model_normalizes = any(isinstance(m, Normalize) for m in self.sentence_transformer)
+            self.normalize_embeddings = self.metric == faiss.METRIC_INNER_PRODUCT and not model_normalizes
+            self._apply_precision()
+            if self.encoder_backend == "onnx":
+                self._load_onnx_encoder(os.environ.get('SENTENCE_TRANSFORMERS_HOME'))
+            if self.compile_model and self.onnx_encoder is None:
+                self._compile_transformer()
+            
+            # Get actual embedding dimension from the model config; models without a
+            # known output size (no pooling/dense module) need one encode to find out
+            dimension = self.sentence_transformer.get_sentence_embedding_dimension()
+            if dimension is None:
+                dimension = self.encode(["test"]).shape[1]
+            self.embedding_dimension = dimension
             logger.info(f"Embedding dimension: {self.embedding_dimension}")
+            self.vector_store = VectorStore(self.embedding_dimension, capacity=max(len(kb_entries), VectorStore.INITIAL_CAPACITY))
             
-            # Initialize FAISS index
-            self._create_faiss_index()
-            
-            # Process existing KB entries
+            # Process existing KB entries; the index is created (and trained, if
+            # the index type needs it) from their embeddings
             if kb_entries:
                 logger.info(f"Processing {len(kb_entries)} existing KB entries")
-                await self._build_index_from_entries(kb_entries)
+                await self._build_index_from_entries(kb_entries, snapshot_path, executor)
+            
+            # Initialize an empty FAISS index if there was nothing to build from
+            if self.faiss_index is None:
+                self._create_faiss_index()
             
             logger.info("Vector index initialization completed successfully")
             
@@ -67,157 +186,523 @@ class VectorManager:
             logger.error(f"Failed to initialize vector index: {e}")
             raise ModelLoadError(f"Vector index initialization failed: {e}")
     
-    def _create_faiss_index(self) -> None:
-        """Create FAISS index based on configuration"""
+    def _apply_precision(self) -> None:
+        """Convert the model for reduced-precision inference where the device supports it"""
+        device_type = self.sentence_transformer.device.type
+        if self.precision == "fp16":
+            if device_type == "cuda":
+                self.sentence_transformer.half()
+            else:
+                # Half precision matmuls are not accelerated on CPU; bf16 is the CPU option
+                logger.warning("fp16 precision requires a CUDA device, falling back to fp32")
+                self.precision = "fp32"
+        elif self.precision == "bf16" and device_type == "cuda":
+            self.sentence_transformer.to(torch.bfloat16)
+        
+        logger.info(f"Model inference precision: {self.precision} on {device_type}")
+    
+    def _load_onnx_encoder(self, cache_folder: Optional[str]) -> None:
+        """Load the ONNX encoder, keeping the SentenceTransformer as the fallback"""
+        modules = list(self.sentence_transformer)
+        pooling = next((m for m in modules if isinstance(m, Pooling)), None)
+        unsupported = [m for m in modules if not isinstance(m, (Transformer, Pooling, Normalize))]
+        if pooling is None or not pooling.pooling_mode_mean_tokens or unsupported:
+            # The ONNX path only reproduces Transformer -> mean Pooling -> optional Normalize
+            logger.warning(f"Model {self.model_name} does not use plain mean pooling, using torch encoder")
+            return
+        
         try:
-            if self.index_type == "IndexFlatIP":
-                # Inner product index (cosine similarity with normalized vectors)
-                self.faiss_index = faiss.IndexFlatIP(self.embedding_dimension)
-            elif self.index_type == "IndexFlatL2":
-                # L2 distance index
-                self.faiss_index = faiss.IndexFlatL2(self.embedding_dimension)
+            self.onnx_encoder = OnnxEncoder.load(
+                self.model_name,
+                max_seq_length=self.sentence_transformer.max_seq_length,
+                normalize=any(isinstance(m, Normalize) for m in modules) or self.normalize_embeddings,
+                cache_folder=cache_folder,
+                quantize=self.onnx_quantize
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load ONNX encoder, using torch encoder: {e}")
+            self.onnx_encoder = None
+        
+        if self.onnx_encoder is not None:
+            logger.info(f"Using ONNX Runtime encoder ({'int8' if self.onnx_quantize else 'fp32'})")
+    
+    def _compile_transformer(self) -> None:
+        """
+        Compile the transformer with torch.compile and warm it up on the common batch
+        sizes; compilation is lazy, so unsupported models only fail here, and fall back to eager
+        """
+        transformer = next((m for m in self.sentence_transformer if isinstance(m, Transformer)), None)
+        if transformer is None or not hasattr(torch, "compile"):
+            logger.warning("torch.compile is not available for this model, using eager inference")
+            return
+        
+        eager_model = transformer.auto_model
+        # CUDA graphs only help on GPU; on CPU the default mode still fuses kernels
+        mode = "reduce-overhead" if self.sentence_transformer.device.type == "cuda" else "default"
+        try:
+            transformer.auto_model = torch.compile(eager_model, mode=mode, dynamic=True)
+            with self._inference_context():
+                for batch_size in COMPILE_WARMUP_BATCH_SIZES:
+                    self.sentence_transformer.encode(["warmup"] * batch_size, batch_size=batch_size)
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager inference: {e}")
+            transformer.auto_model = eager_model
+            return
+        
+        logger.info(f"Compiled transformer with torch.compile (mode={mode})")
+    
+    def _inference_context(self):
+        """Autocast context for bf16 inference on CPU, where weights stay fp32"""
+        if self.precision == "bf16" and self.sentence_transformer.device.type == "cpu":
+            return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+    
+    def _new_base_index(self) -> faiss.Index:
+        """Create the untrained base index described by index_type"""
+        description = LEGACY_INDEX_TYPES.get(self.index_type, self.index_type)
+        try:
+            index = faiss.index_factory(self.embedding_dimension, description, self.metric)
+        except RuntimeError as e:
+            # Default to a flat inner product index
+            logger.warning(f"Unknown index type {self.index_type} ({e}), using flat index")
+            self.built_index_type = "Flat"
+            return faiss.index_factory(self.embedding_dimension, "Flat", self.metric)
+        
+        self.built_index_type = self.index_type
+        self._configure_hnsw(index)
+        return index
+    
+    def _configure_hnsw(self, index: faiss.Index) -> None:
+        """Apply the HNSW build and search breadth if index is, or wraps, an HNSW index"""
+        if isinstance(index, faiss.IndexIDMap):
+            index = faiss.downcast_index(index.index)
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efConstruction = self.hnsw_ef_construction
+            index.hnsw.efSearch = self.hnsw_ef_search
+    
+    def _create_faiss_index(self, training_vectors: Optional[np.ndarray] = None) -> None:
+        """
+        Create FAISS index based on configuration, keyed by KB ID so vectors are
+        added, removed and returned by ID (IVF natively, everything else through
+        IndexIDMap2). Index types that need training
+        (IVF, PQ) are trained on training_vectors; if that is not possible the
+        index falls back to flat.
+        """
+        try:
+            self.delta_index = None
+            self.stale_ids = set()
+            base_index = self._new_base_index()
+            if not base_index.is_trained:
+                try:
+                    if training_vectors is None or len(training_vectors) == 0:
+                        raise RuntimeError("no training vectors")
+                    base_index.train(training_vectors)
+                except RuntimeError as e:
+                    count = 0 if training_vectors is None else len(training_vectors)
+                    logger.warning(f"Cannot train {self.index_type} on {count} vectors ({e}), using flat index")
+                    base_index = faiss.index_factory(self.embedding_dimension, "Flat", self.metric)
+                    self.built_index_type = "Flat"
+            
+            ivf_index = faiss.try_extract_index_ivf(base_index)
+            if ivf_index is not None:
+                # IVF indexes store IDs natively (IndexIDMap2 cannot remove from them);
+                # a hashtable direct map adds remove and reconstruct by ID
+                ivf_index.set_direct_map_type(faiss.DirectMap.Hashtable)
+                self.faiss_index = base_index
             else:
-                # Default to inner product
-                self.faiss_index = faiss.IndexFlatIP(self.embedding_dimension)
-                logger.warning(f"Unknown index type {self.index_type}, using IndexFlatIP")
+                self.faiss_index = faiss.IndexIDMap2(base_index)
             
-            logger.info(f"Created FAISS index: {self.index_type}")
+            if self.use_gpu_faiss:
+                self.faiss_index = self._to_gpu(self.faiss_index)
+            logger.info(f"Created FAISS index: {self.built_index_type}")
             
         except Exception as e:
             raise IndexError(f"Failed to create FAISS index: {e}")
     
-    async def _build_index_from_entries(self, kb_entries: List[KBEntry]) -> None:
+    def _to_gpu(self, cpu_index: faiss.Index) -> faiss.Index:
+        """Replicate the index onto all GPUs (float16 storage), or keep it on CPU if that is not possible"""
+        if not hasattr(faiss, "index_cpu_to_all_gpus") or faiss.get_num_gpus() == 0:
+            logger.warning("GPU FAISS requested but no GPU-enabled FAISS build or device is available, using CPU index")
+            self.use_gpu_faiss = False
+            return cpu_index
+        
+        try:
+            options = faiss.GpuMultipleClonerOptions()
+            options.shard = False
+            options.useFloat16 = True
+            gpu_index = faiss.index_cpu_to_all_gpus(cpu_index, co=options)
+        except RuntimeError as e:
+            # e.g. HNSW has no GPU implementation
+            logger.warning(f"Index type {self.index_type} cannot be moved to GPU ({e}), using CPU index")
+            self.use_gpu_faiss = False
+            return cpu_index
+        
+        logger.info(f"Moved FAISS index to {faiss.get_num_gpus()} GPU(s)")
+        return gpu_index
+    
+    async def _build_index_from_entries(self, kb_entries: List[KBEntry], snapshot_path: Optional[str] = None,
+                                        executor: Optional[Executor] = None) -> None:
         """Build FAISS index from existing KB entries"""
         try:
-            embeddings_list = []
+            # One preallocated matrix filled row by row; row i belongs to valid_entries[i]
+            embeddings = np.empty((len(kb_entries), self.embedding_dimension), dtype=np.float32)
             valid_entries = []
-            
+            stored_count = 0
+            snapshot_count = 0
+            # Rows still waiting for an encoded embedding
+            pending_rows: List[int] = []
+            
+            snapshot = self._load_snapshot(snapshot_path) if snapshot_path else None
+            snapshot_meta, snapshot_embeddings = snapshot if snapshot else ({}, None)
+            snapshot_rows = {kb_id: row for row, kb_id in enumerate(snapshot_meta.get("ids", []))}
+            snapshot_texts = snapshot_meta.get("texts", [])
+            
+            # Reuse the snapshot embedding while the text it was encoded from is unchanged
+            reuse_rows = []
             for entry in kb_entries:
-                # Try to load embedding from context field first
-                embedding = self._load_embedding_from_context(entry.context)
+                row = snapshot_rows.get(entry.id)
+                reuse_rows.append(row if row is not None and snapshot_texts[row] == entry.question else None)
+            
+            # Stored embeddings of every other entry, parsed up front in one pass
+            stored_embeddings = iter(parse_contexts(
+                [entry.context for entry, row in zip(kb_entries, reuse_rows) if row is None],
+                self.embedding_dimension
+            ))
+            
+            for entry, row in zip(kb_entries, reuse_rows):
+                if row is not None:
+                    embeddings[len(valid_entries)] = snapshot_embeddings[row]
+                    valid_entries.append(entry)
+                    snapshot_count += 1
+                    self.cache_manager.put_kb_entry(entry.id, entry)
+                    continue
+                
+                # Try the embedding stored in the context field next
+                embedding = next(stored_embeddings)
                 
                 if embedding is not None:
                     # Use stored embedding
-                    embeddings_list.append(embedding)
+                    embeddings[len(valid_entries)] = embedding
                     valid_entries.append(entry)
+                    stored_count += 1
                     logger.debug(f"Loaded stored embedding for KB ID {entry.id}")
-                else:
-                    # Generate new embedding if not stored
-                    combined_text = entry.question
-                    if combined_text.strip():
-                        logger.info(f"Generating new embedding for KB ID {entry.id}")
-                        new_embedding = self.sentence_transformer.encode([combined_text], convert_to_numpy=True)[0]
-                        
-                        # Normalize for cosine similarity
-                        if self.index_type == "IndexFlatIP":
-                            faiss.normalize_L2(new_embedding.reshape(1, -1))
-                        
-                        embeddings_list.append(new_embedding)
-                        valid_entries.append(entry)
+                elif entry.question.strip():
+                    # Generate new embedding if not stored; encoded below in batches
+                    pending_rows.append(len(valid_entries))
+                    valid_entries.append(entry)
                 
                 # Cache the entry
                 self.cache_manager.put_kb_entry(entry.id, entry)
             
-            if not embeddings_list:
+            if pending_rows:
+                logger.info(f"Generating new embeddings for {len(pending_rows)} KB entries")
+                embeddings[pending_rows] = await self._encode_for_build([valid_entries[i].question for i in pending_rows], executor)
+            
+            if not valid_entries:
                 logger.info("No valid embeddings found")
                 return
             
-            # Convert to numpy array
-            embeddings = np.array(embeddings_list, dtype=np.float32)
-            
-            # Add to FAISS index
-            self.faiss_index.add(embeddings)
+            # Store all vectors contiguously, then add them to FAISS straight from the store
+            self.vector_store.extend(
+                [entry.id for entry in valid_entries],
+                embeddings[:len(valid_entries)],
+                [entry.question for entry in valid_entries],
+                [entry.answer for entry in valid_entries]
+            )
             
-            # Update mapping dictionaries
-            for i, entry in enumerate(valid_entries):
-                self.id_to_index_map[entry.id] = i
-                self.index_to_id_map[i] = entry.id
+            # The saved index is still exact if every vector came from the snapshot,
+            # unless it was a flat fallback for the configured type
+            if not (snapshot_count == len(valid_entries) == len(snapshot_rows)
+                    and snapshot_meta.get("index_type") == self.index_type
+                    and self._read_snapshot_index(snapshot_path)):
+                self._rebuild_index()
             
-            logger.info(f"Successfully built index with {len(valid_entries)} vectors ({len([e for e in kb_entries if self._load_embedding_from_context(e.context) is not None])} from stored embeddings)")
+            logger.info(
+                f"Successfully built index with {len(valid_entries)} vectors "
+                f"({snapshot_count} from snapshot, {stored_count} from stored embeddings)"
+            )
             
         except Exception as e:
             logger.error(f"Failed to build index from entries: {e}")
             raise IndexError(f"Index building failed: {e}")
     
-    def _load_embedding_from_context(self, context: str) -> Optional[np.ndarray]:
-        """Load embedding vector from context field (stored as JSON)"""
+    async def _encode_for_build(self, texts: List[str], executor: Optional[Executor] = None) -> np.ndarray:
+        """
+        Encode many texts for the initial build. Texts are sorted by length so each
+        chunk pads to similar lengths; chunks are encoded one at a time on executor,
+        each as its own task, and results come back in input order.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunks = [order[i:i + ENCODE_BATCH_SIZE] for i in range(0, len(order), ENCODE_BATCH_SIZE)]
+        loop = asyncio.get_running_loop()
+        chunk_embeddings = []
+        for chunk in chunks:
+            chunk_embeddings.append(await loop.run_in_executor(executor, self.encode, [texts[i] for i in chunk]))
+        
+        embeddings = np.empty((len(texts), self.embedding_dimension), dtype=np.float32)
+        for chunk, encoded in zip(chunks, chunk_embeddings):
+            embeddings[chunk] = encoded
+        return embeddings
+    
+    def save_snapshot(self, path: str) -> None:
+        """
+        Write the FAISS index, the stored embeddings and a JSON sidecar to disk.
+        Each file is written to a temporary name and renamed; the sidecar goes
+        last, so a snapshot is only picked up once all three files are complete.
+        """
+        if self.faiss_index is None:
+            return
+        # The snapshot holds one index, so pending delta writes are merged first
+        if self.delta_index is not None:
+            self._rebuild_index()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        embeddings_path = path + SNAPSHOT_EMBEDDINGS_SUFFIX
+        with open(embeddings_path + ".tmp", "wb") as f:
+            np.save(f, self.vector_store.vectors())
+        os.replace(embeddings_path + ".tmp", embeddings_path)
+        
+        index = faiss.index_gpu_to_cpu(self.faiss_index) if self.use_gpu_faiss else self.faiss_index
+        faiss.write_index(index, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        
+        meta = {
+            "snapshot_time": datetime.now(timezone.utc).isoformat(),
+            "model_name": self.model_name,
+            "index_type": self.built_index_type,
+            "dimension": self.embedding_dimension,
+            "encoder": self._encoder_settings(),
+            "ids": self.vector_store.id_array().tolist(),
+            "texts": self.vector_store.texts
+        }
+        meta_path = path + SNAPSHOT_META_SUFFIX
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        
+        logger.info(f"Saved index snapshot with {len(meta['ids'])} vectors to {path}")
+    
+    def _load_snapshot(self, path: str) -> Optional[Tuple[Dict[str, Any], np.ndarray]]:
+        """Load a snapshot's sidecar and memory-mapped embeddings, or None if it is missing or stale"""
+        meta_path = path + SNAPSHOT_META_SUFFIX
+        if not os.path.exists(meta_path):
+            return None
+        
         try:
-            if not context or not context.strip():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            
+            # The index type is checked when the saved index is read; the embeddings
+            # only depend on how they were encoded
+            if (meta.get("model_name") != self.model_name or meta.get("dimension") != self.embedding_dimension
+                    or meta.get("encoder") != self._encoder_settings()):
+                logger.info(f"Ignoring index snapshot {path}: encoded with a different model or encoder settings")
                 return None
             
-            # Try to parse as JSON array
-            import json
-            embedding_list = json.loads(context)
-            
-            if isinstance(embedding_list, list) and len(embedding_list) > 0:
-                # Convert to numpy array
-                embedding = np.array(embedding_list, dtype=np.float32)
-                
-                # Validate dimension
-                if len(embedding) == self.embedding_dimension:
-                    return embedding
-                else:
-                    logger.warning(f"Embedding dimension mismatch: expected {self.embedding_dimension}, got {len(embedding)}")
-                    return None
+            embeddings = np.load(path + SNAPSHOT_EMBEDDINGS_SUFFIX, mmap_mode="r")
+            if embeddings.shape != (len(meta["ids"]), self.embedding_dimension) or len(meta["texts"]) != len(meta["ids"]):
+                logger.warning(f"Ignoring index snapshot {path}: files are inconsistent")
+                return None
             
-            return None
+            logger.info(f"Loaded index snapshot from {meta['snapshot_time']} with {len(meta['ids'])} vectors")
+            return meta, embeddings
             
-        except (json.JSONDecodeError, ValueError, TypeError) as e:
-            # Context is not a valid JSON embedding, return None to generate new one
-            logger.debug(f"Context is not a valid embedding JSON: {e}")
-            return None
         except Exception as e:
-            logger.warning(f"Failed to load embedding from context: {e}")
+            logger.warning(f"Failed to load index snapshot {path}: {e}")
             return None
     
-    def add_vector(self, kb_id: int, text: str, answer: str) -> np.ndarray:
-        """Add new vector to FAISS index"""
+    def _encoder_settings(self) -> Dict[str, Any]:
+        """The effective settings that determine the embeddings, after any load-time fallbacks"""
+        onnx = self.onnx_encoder is not None
+        return {
+            "backend": "onnx" if onnx else "torch",
+            "onnx_quantize": onnx and self.onnx_quantize,
+            # The ONNX encoder always runs in fp32 (or int8 when quantized)
+            "precision": None if onnx else self.precision,
+            "normalize": self.normalize_embeddings
+        }
+    
+    def _read_snapshot_index(self, path: str) -> bool:
+        """Use the saved FAISS index as-is (no re-add or retraining); returns False if it cannot be read"""
+        try:
+            # Not IO_FLAG_MMAP: the index keeps taking adds and removes after
+            # startup, which memory-mapped IVF lists and flat codes reject
+            index = faiss.read_index(path)
+        except Exception as e:
+            logger.warning(f"Failed to read snapshot index {path}: {e}")
+            return False
+        
+        if index.ntotal != len(self.vector_store):
+            logger.warning(f"Snapshot index {path} holds {index.ntotal} vectors, expected {len(self.vector_store)}")
+            return False
+        
+        # The saved HNSW parameters may predate the current settings
+        self._configure_hnsw(index)
+        
+        self.faiss_index = self._to_gpu(index) if self.use_gpu_faiss else index
+        self.built_index_type = self.index_type
+        logger.info(f"Loaded FAISS index from snapshot {path}")
+        return True
+    
+    def _rebuild_index(self) -> None:
+        """Recreate (and retrain, if needed) the FAISS index from the vector store"""
+        vectors = self.vector_store.vectors()
+        self._create_faiss_index(vectors)
+        if len(vectors):
+            self.faiss_index.add_with_ids(vectors, self.vector_store.id_array())
+    
+    def _add_rows(self, start: int) -> None:
+        """Index the freshly appended store rows from start on"""
+        vectors = self.vector_store.vectors()[start:]
+        ids = self.vector_store.id_array()[start:]
+        if self.stale_ids:
+            # A re-added ID can still have a stale copy in the main index, so it goes to the delta
+            readded = np.isin(ids, np.fromiter(self.stale_ids, dtype=np.int64, count=len(self.stale_ids)))
+            for row in (np.flatnonzero(readded) + start).tolist():
+                self._index_vector(int(self.vector_store.ids[row]), row)
+            vectors, ids = vectors[~readded], ids[~readded]
+        if len(ids):
+            self.faiss_index.add_with_ids(vectors, ids)
+    
+    def _index_vector(self, kb_id: int, row: int) -> None:
+        """
+        Make a stored row the searchable vector for its KB ID. The main index is
+        updated in place when it supports removal; otherwise the row goes to the
+        delta index and any main-index copy is marked stale.
+        """
+        ids = np.array([kb_id], dtype=np.int64)
+        vector = self.vector_store.embeddings[row:row + 1]
+        if self.delta_index is None:
+            try:
+                self.faiss_index.remove_ids(ids)
+                self.faiss_index.add_with_ids(vector, ids)
+                return
+            except RuntimeError:
+                self._start_delta()
+        
+        if not self.delta_index.remove_ids(ids):
+            self.stale_ids.add(kb_id)
+        self.delta_index.add_with_ids(vector, ids)
+    
+    def _unindex_vector(self, kb_id: int) -> None:
+        """Remove a KB ID's vector from search, through the stale set when the main index cannot remove it"""
+        ids = np.array([kb_id], dtype=np.int64)
+        if self.delta_index is None:
+            try:
+                self.faiss_index.remove_ids(ids)
+                return
+            except RuntimeError:
+                self._start_delta()
+        
+        if not self.delta_index.remove_ids(ids):
+            self.stale_ids.add(kb_id)
+    
+    def _start_delta(self) -> None:
+        """Route further updates and deletes through a flat delta index instead of rebuilding per write"""
+        logger.info(f"Index type {self.index_type} cannot remove vectors, using a delta index for updates")
+        self.delta_index = faiss.IndexIDMap2(faiss.IndexFlat(self.embedding_dimension, self.metric))
+    
+    def _compact_delta(self) -> None:
+        """Rebuild the main index from the store once the delta index and stale IDs grow too large"""
+        if self.delta_index is None or self.delta_index.ntotal + len(self.stale_ids) < DELTA_INDEX_MAX_SIZE:
+            return
+        logger.info(f"Merging {self.delta_index.ntotal} delta vectors and {len(self.stale_ids)} stale IDs into the main index")
+        self._rebuild_index()
+    
+    def _search_index(self, query_embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-1 (scores, labels) per query over the main index, skipping stale IDs,
+        merged with the delta index; labels are -1 where nothing was found
+        """
+        if self.delta_index is None:
+            scores, labels = self.faiss_index.search(query_embeddings, k=1)
+            return scores[:, 0], labels[:, 0]
+        
+        # Ask the main index for enough neighbours that one is not stale
+        scores, labels = self.faiss_index.search(query_embeddings, k=1 + len(self.stale_ids))
+        hidden = np.isin(labels, np.fromiter(self.stale_ids, dtype=np.int64, count=len(self.stale_ids))) | (labels < 0)
+        rows = np.arange(len(labels))
+        first = hidden.argmin(axis=1)
+        found = ~hidden[rows, first]
+        worst = -np.inf if self.metric == faiss.METRIC_INNER_PRODUCT else np.inf
+        best_scores = np.where(found, scores[rows, first], worst).astype(np.float32)
+        best_labels = np.where(found, labels[rows, first], -1)
+        
+        if self.delta_index.ntotal:
+            delta_scores, delta_labels = self.delta_index.search(query_embeddings, k=1)
+            delta_scores, delta_labels = delta_scores[:, 0], delta_labels[:, 0]
+            if self.metric == faiss.METRIC_INNER_PRODUCT:
+                use_delta = (delta_labels >= 0) & (delta_scores > best_scores)
+            else:
+                use_delta = (delta_labels >= 0) & (delta_scores < best_scores)
+            best_scores = np.where(use_delta, delta_scores, best_scores)
+            best_labels = np.where(use_delta, delta_labels, best_labels)
+        return best_scores, best_labels
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts in forward passes of at most ENCODE_BATCH_SIZE and return a
+        (len(texts), dim) float32 array, L2-normalized when the index uses inner product. Normalization happens
+        exactly once, inside the model or the encoder, never as a second pass.
+        """
+        if not self.sentence_transformer:
+            raise IndexError("Vector manager not properly initialized")
+        
+        if self.onnx_encoder is not None:
+            embeddings = np.concatenate([
+                self.onnx_encoder.encode(texts[i:i + ENCODE_BATCH_SIZE])
+                for i in range(0, len(texts), ENCODE_BATCH_SIZE)
+            ])
+        else:
+            with self._inference_context():
+                embeddings = self.sentence_transformer.encode(
+                    texts, batch_size=ENCODE_BATCH_SIZE, convert_to_numpy=True,
+                    normalize_embeddings=self.normalize_embeddings
+                )
+        # Reduced-precision outputs are cast back so the FAISS index stays float32
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Token count of each text after truncation to the model's max sequence length"""
+        encoded = self.sentence_transformer.tokenizer(
+            texts, truncation=True, max_length=self.sentence_transformer.max_seq_length
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def _query_embedding(self, text: str, embedding: Optional[np.ndarray]) -> np.ndarray:
+        """Return a (1, dim) float32 embedding, encoding the text unless one was precomputed"""
+        if embedding is None:
+            return self.encode([text])
+        return np.ascontiguousarray(embedding, dtype=np.float32).reshape(1, -1)
+    
+    def add_vector(self, kb_id: int, text: str, answer: str,
+                   embedding: Optional[np.ndarray] = None) -> np.ndarray:
+        """Add new vector to FAISS index, using a precomputed embedding if one is given"""
         try:
             if not self.sentence_transformer or not self.faiss_index:
                 raise IndexError("Vector manager not properly initialized")
             
             # Check if vector already exists for this KB ID
-            if kb_id in self.id_to_index_map:
+            if kb_id in self.vector_store:
                 logger.warning(f"Vector for KB ID {kb_id} already exists, updating instead of adding")
-                return self.update_vector(kb_id, text, answer)
+                return self.update_vector(kb_id, text, answer, embedding)
             
             # Generate embedding
-            embedding = self.sentence_transformer.encode([text], convert_to_numpy=True)
-            
-            # Normalize for cosine similarity
-            if self.index_type == "IndexFlatIP":
-                faiss.normalize_L2(embedding)
-            
-            # Add to index
-            current_size = self.faiss_index.ntotal
-            self.faiss_index.add(embedding.astype(np.float32))
-            
-            # Update mappings
-            self.id_to_index_map[kb_id] = current_size
-            self.index_to_id_map[current_size] = kb_id
-            
-            logger.info(f"Added vector to FAISS index: KB ID {kb_id} -> index position {current_size}")
-            logger.info(f"Current index size: {self.faiss_index.ntotal}, mappings: {len(self.id_to_index_map)}")
-            
-            # Cache vector data
-            vector_data = VectorData(kb_id, embedding[0], text, answer)
-            self.cache_manager.put_vector_data(kb_id, vector_data)
-            
-            # Also cache KB entry for similarity search
-            from datetime import datetime
-            import json
-            # Store embedding as JSON string in context for future use
-            embedding_json = json.dumps(embedding[0].tolist())
-            kb_entry = KBEntry(
-                id=kb_id,
-                category="",  # Will be updated when full KB entry is available
-                question=text,
-                context=embedding_json,  # Store embedding as JSON
-                answer=answer,
-                create_time=datetime.now(),
-                update_time=datetime.now()
-            )
-            self.cache_manager.put_kb_entry(kb_id, kb_entry)
+            embedding = self._query_embedding(text, embedding)
+            
+            # Add to the store, then to the index from the stored row
+            row = self.vector_store.append(kb_id, embedding[0], text, answer)
+            self._add_rows(row)
+            self._compact_delta()
+            self.result_cache.clear()
+            
+            logger.info(f"Added vector to FAISS index: KB ID {kb_id}")
+            logger.info(f"Current index size: {self.get_index_size()}")
+            
+            self._cache_vector(kb_id, embedding[0], text, answer)
             
             logger.info(f"Added vector for KB ID {kb_id} and updated cache")
             logger.info(f"Added text: '{text[:50]}...'")
@@ -228,97 +713,100 @@ class VectorManager:
             logger.error(f"Failed to add vector for KB ID {kb_id}: {e}")
             raise IndexError(f"Vector addition failed: {e}")
     
-    def update_vector(self, kb_id: int, text: str, answer: str) -> np.ndarray:
-        """Update existing vector in FAISS index"""
+    def add_vectors(self, items: List[Tuple[int, str, str]],
+                    embeddings: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """
+        Add many (kb_id, text, answer) items with a single FAISS add, using precomputed
+        embeddings if given. IDs that are already indexed are updated instead.
+        Returns each item's embedding, in order.
+        """
         try:
-            if kb_id not in self.id_to_index_map:
-                # If vector doesn't exist, add it
-                return self.add_vector(kb_id, text, answer)
-            
-            # Generate new embedding
-            embedding = self.sentence_transformer.encode([text], convert_to_numpy=True)
-            
-            # Normalize for cosine similarity
-            if self.index_type == "IndexFlatIP":
-                faiss.normalize_L2(embedding)
+            if not self.sentence_transformer or not self.faiss_index:
+                raise IndexError("Vector manager not properly initialized")
             
-            # Get the index position for this KB ID
-            index_pos = self.id_to_index_map[kb_id]
+            if len({kb_id for kb_id, _, _ in items}) != len(items):
+                raise IndexError("Duplicate KB IDs in batch")
             
-            # Update the vector in FAISS index
-            # For IndexFlat, we can reconstruct and update the specific vector
-            if hasattr(self.faiss_index, 'reconstruct'):
-                # Update the vector at the specific position
-                self.faiss_index.reconstruct(index_pos)  # This validates the position exists
-                
-                # Create a new index with updated vector
-                # Since FAISS IndexFlat doesn't support in-place updates, we need to rebuild
-                logger.info(f"Rebuilding FAISS index to update vector for KB ID {kb_id}")
-                
-                # Get all current vectors
-                all_vectors = []
-                all_kb_ids = []
-                
-                for current_kb_id, current_index_pos in self.id_to_index_map.items():
-                    if current_kb_id == kb_id:
-                        # Use the new embedding for this KB ID
-                        all_vectors.append(embedding[0])
-                    else:
-                        # Reconstruct existing vector
-                        existing_vector = self.faiss_index.reconstruct(current_index_pos)
-                        all_vectors.append(existing_vector)
-                    all_kb_ids.append(current_kb_id)
-                
-                # Rebuild the index
-                if all_vectors:
-                    vectors_array = np.array(all_vectors).astype('float32')
-                    
-                    # Create new index
-                    new_index = faiss.IndexFlatIP(self.embedding_dimension) if self.index_type == "IndexFlatIP" else faiss.IndexFlatL2(self.embedding_dimension)
-                    new_index.add(vectors_array)
-                    
-                    # Replace the old index
-                    self.faiss_index = new_index
-                    
-                    # Rebuild mappings
-                    self.id_to_index_map.clear()
-                    self.index_to_id_map.clear()
-                    
-                    for i, current_kb_id in enumerate(all_kb_ids):
-                        self.id_to_index_map[current_kb_id] = i
-                        self.index_to_id_map[i] = current_kb_id
-                    
-                    logger.info(f"Successfully rebuilt FAISS index with updated vector for KB ID {kb_id}")
+            # Generate embeddings
+            if embeddings is None:
+                embeddings = self.encode([text for _, text, _ in items])
             else:
-                # Fallback: simple replacement (less efficient but works)
-                logger.warning(f"Using fallback method for vector update of KB ID {kb_id}")
+                embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            
+            new_positions = [i for i, (kb_id, _, _) in enumerate(items) if kb_id not in self.vector_store]
+            if new_positions:
+                # Add all new vectors to the store and the index at once
+                start = self.vector_store.extend(
+                    [items[i][0] for i in new_positions],
+                    embeddings[new_positions],
+                    [items[i][1] for i in new_positions],
+                    [items[i][2] for i in new_positions]
+                )
+                self._add_rows(start)
+                self._compact_delta()
+                self.result_cache.clear()
                 
-                # Remove and re-add (this will append to the end)
-                self.delete_vector(kb_id)
-                return self.add_vector(kb_id, text, answer)
+                for i in new_positions:
+                    kb_id, text, answer = items[i]
+                    self._cache_vector(kb_id, embeddings[i], text, answer)
+            
+            # Existing IDs go through the regular update path
+            new_set = set(new_positions)
+            for i, (kb_id, text, answer) in enumerate(items):
+                if i not in new_set:
+                    logger.warning(f"Vector for KB ID {kb_id} already exists, updating instead of adding")
+                    self.update_vector(kb_id, text, answer, embeddings[i])
+            
+            logger.info(f"Added {len(new_positions)} vectors in batch, updated {len(items) - len(new_positions)}, index size: {self.get_index_size()}")
+            return [embeddings[i] for i in range(len(items))]
+            
+        except Exception as e:
+            logger.error(f"Failed to add batch of {len(items)} vectors: {e}")
+            raise IndexError(f"Batch vector addition failed: {e}")
+    
+    def _cache_vector(self, kb_id: int, embedding: np.ndarray, text: str, answer: str) -> None:
+        """Cache the vector data and a KB entry for a freshly indexed embedding"""
+        # Cache vector data
+        vector_data = VectorData(kb_id, embedding, text, answer)
+        self.cache_manager.put_vector_data(kb_id, vector_data)
+        
+        # Also cache KB entry for similarity search, which only reads the answer.
+        # The embedding is already in the vector store, so the context column
+        # (only ever read from database rows at startup) is not serialized here
+        now = datetime.now()
+        kb_entry = KBEntry(
+            id=kb_id,
+            category="",  # Will be updated when full KB entry is available
+            question=text,
+            context="",
+            answer=answer,
+            create_time=now,
+            update_time=now
+        )
+        self.cache_manager.put_kb_entry(kb_id, kb_entry)
+    
+    def update_vector(self, kb_id: int, text: str, answer: str,
+                      embedding: Optional[np.ndarray] = None) -> np.ndarray:
+        """Update existing vector in FAISS index, using a precomputed embedding if one is given"""
+        try:
+            if kb_id not in self.vector_store:
+                # If vector doesn't exist, add it
+                return self.add_vector(kb_id, text, answer, embedding)
+            
+            # Generate new embedding
+            embedding = self._query_embedding(text, embedding)
+            
+            # Replace the vector under its KB ID
+            row = self.vector_store.set(kb_id, embedding[0], text, answer)
+            self._index_vector(kb_id, row)
+            self._compact_delta()
+            self.result_cache.clear()
             
             # Invalidate cache entry to force refresh
             self.cache_manager.invalidate_entry(kb_id)
             
-            # Cache updated vector data
-            vector_data = VectorData(kb_id, embedding[0], text, answer)
-            self.cache_manager.put_vector_data(kb_id, vector_data)
-            
-            # Also update KB entry cache
-            from datetime import datetime
-            import json
-            # Store embedding as JSON string in context for future use
-            embedding_json = json.dumps(embedding[0].tolist())
-            kb_entry = KBEntry(
-                id=kb_id,
-                category="",  # Will be updated when full KB entry is available
-                question=text,
-                context=embedding_json,  # Store embedding as JSON
-                answer=answer,
-                create_time=datetime.now(),
-                update_time=datetime.now()
-            )
-            self.cache_manager.put_kb_entry(kb_id, kb_entry)
+            # Cache updated vector data and KB entry
+            self._cache_vector(kb_id, embedding[0], text, answer)
             
             # Mark as dirty for potential synchronization
             self.cache_manager.mark_vector_dirty(kb_id)
@@ -333,54 +821,14 @@ class VectorManager:
     def delete_vector(self, kb_id: int) -> bool:
         """Delete vector from FAISS index"""
         try:
-            if kb_id not in self.id_to_index_map:
+            if kb_id not in self.vector_store:
                 logger.warning(f"Vector for KB ID {kb_id} not found in index")
                 return False
             
-            # Get the index position for this KB ID
-            index_pos = self.id_to_index_map[kb_id]
-            
-            # FAISS IndexFlat doesn't support direct deletion, so we rebuild the index
-            logger.info(f"Rebuilding FAISS index to delete vector for KB ID {kb_id}")
-            
-            # Get all current vectors except the one to delete
-            all_vectors = []
-            all_kb_ids = []
-            
-            for current_kb_id, current_index_pos in self.id_to_index_map.items():
-                if current_kb_id != kb_id:  # Skip the vector to delete
-                    # Reconstruct existing vector
-                    if hasattr(self.faiss_index, 'reconstruct'):
-                        existing_vector = self.faiss_index.reconstruct(current_index_pos)
-                        all_vectors.append(existing_vector)
-                        all_kb_ids.append(current_kb_id)
-            
-            # Rebuild the index without the deleted vector
-            if all_vectors:
-                vectors_array = np.array(all_vectors).astype('float32')
-                
-                # Create new index
-                new_index = faiss.IndexFlatIP(self.embedding_dimension) if self.index_type == "IndexFlatIP" else faiss.IndexFlatL2(self.embedding_dimension)
-                new_index.add(vectors_array)
-                
-                # Replace the old index
-                self.faiss_index = new_index
-                
-                # Rebuild mappings
-                self.id_to_index_map.clear()
-                self.index_to_id_map.clear()
-                
-                for i, current_kb_id in enumerate(all_kb_ids):
-                    self.id_to_index_map[current_kb_id] = i
-                    self.index_to_id_map[i] = current_kb_id
-                
-                logger.info(f"Successfully rebuilt FAISS index without vector for KB ID {kb_id}")
-            else:
-                # No vectors left, create empty index
-                self.faiss_index = faiss.IndexFlatIP(self.embedding_dimension) if self.index_type == "IndexFlatIP" else faiss.IndexFlatL2(self.embedding_dimension)
-                self.id_to_index_map.clear()
-                self.index_to_id_map.clear()
-                logger.info(f"Created empty FAISS index after deleting last vector (KB ID {kb_id})")
+            self.vector_store.remove(kb_id)
+            self._unindex_vector(kb_id)
+            self._compact_delta()
+            self.result_cache.clear()
             
             # Remove from cache
             self.cache_manager.invalidate_entry(kb_id)
@@ -392,76 +840,70 @@ class VectorManager:
             logger.error(f"Failed to delete vector for KB ID {kb_id}: {e}")
             raise IndexError(f"Vector deletion failed: {e}")
     
-    def search_similar(self, query: str) -> Optional[SimilarityResult]:
-        """Search for similar vectors using FAISS"""
+    def search_similar(self, query: str, query_embedding: Optional[np.ndarray] = None) -> Optional[SimilarityResult]:
+        """Search for similar vectors using FAISS, using a precomputed query embedding if one is given"""
+        if not self.sentence_transformer or not self.faiss_index:
+            raise IndexError("Vector manager not properly initialized")
+        
+        return self.search_similar_batch([query], self._query_embedding(query, query_embedding))[0]
+    
+    def search_similar_batch(self, queries: List[str], query_embeddings: np.ndarray) -> List[Optional[SimilarityResult]]:
+        """
+        Search many queries with a single FAISS call over a (len(queries), dim) matrix.
+        Returns the best match per query, or None where nothing clears the threshold.
+        """
         try:
             if not self.sentence_transformer or not self.faiss_index:
                 raise IndexError("Vector manager not properly initialized")
             
-            if self.faiss_index.ntotal == 0:
-                logger.info("No vectors in index for search")
-                return None
-            
-            # Generate query embedding
-            query_embedding = self.sentence_transformer.encode([query], convert_to_numpy=True)
-            
-            # Normalize for cosine similarity
-            if self.index_type == "IndexFlatIP":
-                faiss.normalize_L2(query_embedding)
-            
-            logger.info(f"Query: '{query[:50]}...'")
-            logger.info(f"Query embedding shape: {query_embedding.shape}")
-            logger.info(f"Query embedding first 5 values: {query_embedding[0][:5]}")
-            
-            # Search for most similar vector - get top 5 to see all candidates
-            k = min(5, self.faiss_index.ntotal)
-            scores, indices = self.faiss_index.search(query_embedding.astype(np.float32), k=k)
-            
-            logger.info(f"FAISS search results (top {k}): scores={scores[0]}, indices={indices[0]}")
-            logger.info(f"Current index mappings: {self.index_to_id_map}")
-            logger.info(f"Total vectors in index: {self.faiss_index.ntotal}")
-            
-            if len(scores[0]) == 0:
-                logger.info("No search results returned from FAISS")
-                return None
-            
-            # Use the best match (first result)
-            similarity_score = float(scores[0][0])
-            best_index = int(indices[0][0])
-            
-            logger.info(f"Best match: index={best_index}, score={similarity_score}, threshold={self.similarity_threshold}")
-            
-            # Check similarity threshold
-            if similarity_score < self.similarity_threshold:
-                logger.info(f"Best similarity score {similarity_score} below threshold {self.similarity_threshold}")
-                return None
-            
-            # Get KB ID from index mapping
-            kb_id = self.index_to_id_map.get(best_index)
-            if not kb_id:
-                logger.error(f"No KB ID found for index {best_index}. Available mappings: {self.index_to_id_map}")
-                return None
-            
-            logger.info(f"Found KB ID {kb_id} for index {best_index}")
-            
-            # Get KB entry from cache
-            kb_entry = self.cache_manager.get_kb_entry(kb_id)
-            if not kb_entry:
-                logger.error(f"KB entry {kb_id} not found in cache - this should not happen after proper add/update")
-                return None
-            
-            # Determine confidence level
-            confidence_level = self._get_confidence_level(similarity_score)
-            
-            result = SimilarityResult(
-                kb_id=kb_id,
-                similarity_score=similarity_score,
-                answer=kb_entry.answer,
-                confidence_level=confidence_level
-            )
+            if self.get_index_size() == 0:
+                logger.debug("No vectors in index for search")
+                return [None] * len(queries)
+            
+            # Repeated queries are answered from the result cache; only misses go to FAISS
+            generation = self.result_cache.generation
+            results: List[Optional[SimilarityResult]] = [None] * len(queries)
+            misses: List[int] = []
+            for i, query in enumerate(queries):
+                found, result = self.result_cache.get(query)
+                if found:
+                    results[i] = result
+                else:
+                    misses.append(i)
+            if not misses:
+                return results
+            
+            # Gathering rows copies; the usual all-miss batch goes to FAISS as-is
+            if len(misses) < len(queries):
+                query_embeddings = query_embeddings[misses]
+            query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+            scores, labels = self._search_index(query_embeddings)
+            
+            # tolist() yields plain Python floats/ints in one call instead of numpy scalars per row
+            for i, similarity_score, kb_id in zip(misses, scores.tolist(), labels.tolist()):
+                query = queries[i]
+                # Approximate indexes return -1 when no neighbour is found
+                if kb_id < 0 or similarity_score < self.similarity_threshold:
+                    logger.debug("No match above threshold %s for query: %.50r", self.similarity_threshold, query)
+                    self.result_cache.put(query, None, generation)
+                    continue
+                
+                # Get KB entry from cache
+                kb_entry = self.cache_manager.get_kb_entry(kb_id)
+                if not kb_entry:
+                    logger.error(f"KB entry {kb_id} not found in cache - this should not happen after proper add/update")
+                    continue
+                
+                results[i] = SimilarityResult(
+                    kb_id=kb_id,
+                    similarity_score=similarity_score,
+                    answer=kb_entry.answer,
+                    confidence_level=self._get_confidence_level(similarity_score)
+                )
+                self.result_cache.put(query, results[i], generation)
+                logger.debug("Found similar content: KB ID %s, score %s", kb_id, similarity_score)
             
-            logger.info(f"Found similar content: KB ID {kb_id}, score {similarity_score}")
-            return result
+            return results
             
         except Exception as e:
             logger.error(f"Failed to search similar vectors: {e}")
@@ -477,8 +919,8 @@ class VectorManager:
             return "low"
     
     def get_index_size(self) -> int:
-        """Get current index size"""
-        return self.faiss_index.ntotal if self.faiss_index else 0
+        """Get current index size (searchable vectors, not counting stale main-index copies)"""
+        return len(self.vector_store) if self.faiss_index else 0
     
     def get_cache_size(self) -> int:
         """Get current cache size"""
@@ -487,6 +929,7 @@ class VectorManager:
     def clear_cache(self) -> None:
         """Clear KB cache"""
         self.cache_manager.clear_all()
+        self.result_cache.clear()
         logger.info("KB cache cleared")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -509,14 +952,20 @@ class VectorManager:
     def invalidate_cache_entry(self, kb_id: int) -> None:
         """Invalidate cache entry for a specific KB ID"""
         self.cache_manager.invalidate_entry(kb_id)
+        self.result_cache.clear()
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get detailed cache information"""
         return {
             "stats": self.cache_manager.get_cache_stats(),
+            "embedding_cache": self.embedding_cache.get_stats(),
+            "result_cache": self.result_cache.get_stats(),
             "entries": self.cache_manager.get_cache_entries_info()
         }
     
     def sync_cache_with_database(self, kb_loader) -> Dict[str, int]:
         """Synchronize cache with database"""
-        return self.cache_manager.sync_with_database(kb_loader, self)
\ No newline at end of file
+        sync_stats = self.cache_manager.sync_with_database(kb_loader, self)
+        # Synced entries may carry new answers
+        self.result_cache.clear()
+        return sync_stats
\ No newline at end of file